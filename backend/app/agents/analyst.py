@@ -0,0 +1,98 @@
+# File: backend/app/agents/analyst.py
+import re
+from typing import Optional, Tuple
+from ..core.multi_llm import multi_llm_client
+from ..core.router import FASTEST
+from ..core.tokens import count_tokens
+from .summarizer import SummarizerAgent
+from .reviewer import ReviewerAgent, Review
+import logging
+
+logger = logging.getLogger("orchestrateai.agent.analyst")
+
+class AnalystAgent:
+    """
+    Summarizes and reviews a source in a single LLM call (the fused mode).
+
+    The reviewer sees the original text instead of the summary, and each
+    source costs one round-trip instead of two. Pages too long for one call
+    fall back to the summarizer's map-reduce followed by a separate review;
+    sources whose domain reputation settles the verdict are only summarized.
+    """
+
+    def __init__(self, summarizer: Optional[SummarizerAgent] = None, reviewer: Optional[ReviewerAgent] = None):
+        self.multi_llm = multi_llm_client
+        # Provider routing strategy for this agent's calls
+        self.routing_strategy = FASTEST
+        self.summarizer = summarizer or SummarizerAgent()
+        self.reviewer = reviewer or ReviewerAgent()
+        self.max_tokens = self.summarizer.summary_max_tokens + self.reviewer.batch_tokens_per_source
+
+        self.system_prompt = (
+            "You are a meticulous research analyst. First write a detailed synthesis of the source "
+            "below, including key points, supporting details, and relevant facts; do not overly "
+            "compress. Then critically evaluate the source itself: assess its reliability, check for "
+            "bias, and identify key claims. Be objective and analytical.\n\n"
+            "Respond in the following format, and do not include any other text:\n"
+            "[SUMMARY]\n"
+            "Your detailed synthesis of the source.\n"
+            "[/SUMMARY]\n"
+            "RELIABLE: [YES/NO]\n"
+            "CRITIQUE: [Your detailed critique]\n"
+            "CLAIMS: [List of key claims, separated by commas]"
+        )
+
+    def _build_prompt(self, query: str, content: str, url: str) -> str:
+        return f"{self.system_prompt}\n\nOriginal Query: {query}\nSource URL: {url}\n\nSource Text:\n---\n{content}\n---"
+
+    def _parse_response(self, response_text: str) -> Tuple[str, Optional[Review]]:
+        """Split the answer into the summary and a Review; the Review is None if no verdict was given."""
+        summary_match = re.search(r"\[SUMMARY\](.*?)(?:\[/SUMMARY\]|(?=^\s*RELIABLE:))", response_text,
+                                  re.DOTALL | re.IGNORECASE | re.MULTILINE)
+        verdict = re.search(r"^\s*RELIABLE:", response_text, re.IGNORECASE | re.MULTILINE)
+        if summary_match:
+            summary = summary_match.group(1).strip()
+            rest = response_text[summary_match.end():]
+        elif verdict:
+            # No summary markers: everything before the verdict is the summary
+            summary = response_text[:verdict.start()].strip()
+            rest = response_text[verdict.start():]
+        else:
+            return response_text.strip(), None
+        if not re.search(r"RELIABLE:", rest, re.IGNORECASE):
+            return summary, None
+        return summary, self.reviewer.parse_review_response(rest.strip())
+
+    def _fits(self, content: str) -> bool:
+        """Whether the source fits one call, under the same cap as a summarizer chunk."""
+        overhead = count_tokens(self._build_prompt("", "", "")) + 256
+        available = self.multi_llm.context_window() - self.max_tokens - overhead
+        return count_tokens(content) <= min(self.summarizer.max_chunk_tokens, available)
+
+    def analyze(self, query: str, content: str, url: str) -> Tuple[str, Review]:
+        """
+        Summarizes a source and reviews its reliability.
+
+        Args:
+            query: The research task the source was found for.
+            content: The source text.
+            url: The source URL for context.
+
+        Returns:
+            The summary and a Review object.
+        """
+        known = self.reviewer.reputation_review(url)
+        if known is not None or not self._fits(content):
+            # Only a summary is needed, or the page is too long for one call
+            summary = self.summarizer.summarize(query, content)
+            return summary, known or self.reviewer.review(summary, url)
+
+        logger.info(f"Summarizing and reviewing in one call: {url}")
+        response = self.multi_llm.generate_with_fallback(
+            self._build_prompt(query, content, url), max_tokens=self.max_tokens, strategy=self.routing_strategy)
+        summary, review = self._parse_response(response)
+        if review is None:
+            logger.warning(f"Fused answer for {url} had no verdict; reviewing the summary separately")
+            return summary, self.reviewer.review(summary, url)
+        self.reviewer.record_outcome(url, review)
+        return summary, review
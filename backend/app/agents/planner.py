@@ -21,9 +21,9 @@ class PlannerAgent:
     def __init__(self):
         self.multi_llm = multi_llm_client
 
-    def _multi_llm_plan(self, query):
+    def _build_prompt(self, query: str) -> str:
         # --- FIX: Improved prompt with clear delimiters ---
-        prompt = (
+        return (
             "You are an expert research planner. Your job is to create a clear, "
             "step-by-step research plan for the given query. Decompose the query into "
             "2-3 specific, answerable sub-tasks. Provide a brief summary of your plan.\n\n"
@@ -38,12 +38,23 @@ class PlannerAgent:
             "[/TASKS]\n\n"
             f"Create a research plan for the following query: {query}"
         )
-        
-        return self.multi_llm.generate_with_fallback(prompt, max_tokens=800)
+
+    def _multi_llm_plan(self, query):
+        return self.multi_llm.generate_with_fallback(self._build_prompt(query), max_tokens=800)
+
+    async def _amulti_llm_plan(self, query):
+        return await self.multi_llm.agenerate_with_fallback(self._build_prompt(query), max_tokens=800)
 
     def create_plan(self, query: str) -> ResearchPlan:
         plan_text = self._multi_llm_plan(query)
-        
+        return self._parse_plan(plan_text, query)
+
+    async def acreate_plan(self, query: str) -> ResearchPlan:
+        """Async variant of ``create_plan``."""
+        plan_text = await self._amulti_llm_plan(query)
+        return self._parse_plan(plan_text, query)
+
+    def _parse_plan(self, plan_text: str, query: str) -> ResearchPlan:
         # --- FIX: More robust parsing logic based on the new prompt format ---
         tasks = []
         summary = "No summary generated."
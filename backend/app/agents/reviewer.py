@@ -1,23 +1,41 @@
 # File: backend/app/agents/reviewer.py
 import os
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import re
 from ..core.multi_llm import multi_llm_client
+from ..core.concurrency import bounded_map
+from ..core.tokens import count_tokens
+from ..core.reputation import domain_reputation, registrable_domain
+from ..core.metrics import REPUTATION_DECISIONS
 import logging
 
 logger = logging.getLogger("orchestrateai.agent.reviewer")
 
+# Provider errors that mean the request was too big, not that the provider is down
+_SIZE_ERROR_MARKERS = ("context_length", "context length", "context window", "maximum context",
+                       "too many tokens", "max_tokens", "request too large", "413", "reduce the length")
+
+
+def _is_size_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in _SIZE_ERROR_MARKERS)
+
+
 class Review(BaseModel):
     """A structured review of a summary's reliability and content."""
     critique: str = Field(description="Constructive critique of the summary, noting any bias or logical fallacies.")
     is_reliable: bool = Field(description="A boolean flag indicating if the source appears reliable.")
     verified_claims: List[str] = Field(description="A list of key claims from the summary that were checked.")
+    has_verdict: bool = Field(default=False, exclude=True,
+                              description="Whether the LLM answer contained an explicit RELIABLE: YES/NO verdict.")
 
 class ReviewerAgent:
     def __init__(self):
         # Use multi-LLM client
         self.multi_llm = multi_llm_client
+        # Domains with a settled verdict skip the LLM review
+        self.reputation = domain_reputation
         
         self.system_prompt = (
             "You are a meticulous and skeptical Reviewer Agent. Your job is to "
@@ -28,20 +46,50 @@ class ReviewerAgent:
             "CRITIQUE: [Your detailed critique]\n"
             "CLAIMS: [List of key claims, separated by commas]"
         )
+        
+        self.review_max_tokens = 500
+        # Batch reviews: up to `batch_size` summaries share one call, with
+        # `batch_tokens_per_source` answer tokens each; batches are split to
+        # keep the answer under `batch_max_output_tokens` and the prompt inside
+        # the smallest provider context window.
+        self.batch_size = max(1, int(os.getenv("REVIEW_BATCH_SIZE", "8")))
+        self.batch_tokens_per_source = 250
+        self.batch_max_output_tokens = int(os.getenv("REVIEW_BATCH_MAX_OUTPUT_TOKENS", "2000"))
+        self.batch_system_prompt = (
+            "You are a meticulous and skeptical Reviewer Agent. Your job is to "
+            "critically evaluate each of the numbered summaries below based on its content. "
+            "Assess its reliability, check for bias, and identify key claims. Review every "
+            "summary independently. Be objective and analytical.\n\n"
+            "Respond with one block per summary, in order, in the following format:\n"
+            "[SOURCE n]\n"
+            "RELIABLE: [YES/NO]\n"
+            "CRITIQUE: [Your detailed critique]\n"
+            "CLAIMS: [List of key claims, separated by commas]\n"
+            "[/SOURCE n]"
+        )
+    
+    def _build_prompt(self, summary: str, url: str) -> str:
+        return f"{self.system_prompt}\n\nPlease review the following summary:\n\nSummary:\n---\n{summary}\n---\nSource URL: {url}"
     
     def _review_with_multi_llm(self, summary: str, url: str):
         """Review using multi-LLM with fallback."""
         logger.info(f"Reviewing summary for URL: {url}")
         
-        prompt = f"{self.system_prompt}\n\nPlease review the following summary:\n\nSummary:\n---\n{summary}\n---\nSource URL: {url}"
+        response = self.multi_llm.generate_with_fallback(self._build_prompt(summary, url), max_tokens=self.review_max_tokens)
+        return self.parse_review_response(response)
+    
+    async def _areview_with_multi_llm(self, summary: str, url: str):
+        """Async review using multi-LLM with fallback."""
+        logger.info(f"Reviewing summary for URL: {url}")
         
-        response = self.multi_llm.generate_with_fallback(prompt, max_tokens=500)
-        return self._parse_review_response(response)
+        response = await self.multi_llm.agenerate_with_fallback(self._build_prompt(summary, url), max_tokens=self.review_max_tokens)
+        return self.parse_review_response(response)
     
-    def _parse_review_response(self, response_text: str) -> Review:
+    def parse_review_response(self, response_text: str) -> Review:
         """Parse the text response into a Review object."""
         # Default values
         is_reliable = False
+        has_verdict = False
         critique = "Unable to parse review response"
         verified_claims = []
         
@@ -50,6 +98,7 @@ class ReviewerAgent:
             reliable_match = re.search(r'RELIABLE:\s*(YES|NO)', response_text, re.IGNORECASE)
             if reliable_match:
                 is_reliable = reliable_match.group(1).upper() == 'YES'
+                has_verdict = True
             
             # Extract CRITIQUE field
             critique_match = re.search(r'CRITIQUE:\s*(.*?)(?=\nCLAIMS:|$)', response_text, re.DOTALL | re.IGNORECASE)
@@ -69,9 +118,34 @@ class ReviewerAgent:
         return Review(
             critique=critique,
             is_reliable=is_reliable,
-            verified_claims=verified_claims
+            verified_claims=verified_claims,
+            has_verdict=has_verdict,
         )
     
+    def reputation_review(self, url: str) -> Optional[Review]:
+        """The review implied by the domain's reputation, or None if it needs an LLM review."""
+        verdict = self.reputation.verdict(url)
+        if verdict is None:
+            return None
+        domain = registrable_domain(url)
+        if verdict:
+            REPUTATION_DECISIONS.inc(decision="trusted")
+            critique = f"Source domain {domain} has a consistently reliable track record; detailed review skipped."
+        else:
+            REPUTATION_DECISIONS.inc(decision="blocked")
+            critique = f"Source domain {domain} has a consistently unreliable track record."
+        logger.info(f"Reputation verdict for {url}: {'trusted' if verdict else 'blocked'}")
+        return Review(critique=critique, is_reliable=verdict, verified_claims=[])
+    
+    def record_outcome(self, url: str, review: Optional[Review]):
+        """
+        Feed an LLM review into the domain reputation table. Answers without
+        an explicit verdict (empty, truncated or garbled) are not evidence
+        about the domain and are ignored.
+        """
+        if review is not None and review.has_verdict:
+            self.reputation.record(url, review.is_reliable)
+    
     def review(self, summary: str, url: str) -> Review:
         """
         Reviews a summary for bias, reliability, and key claims.
@@ -83,4 +157,121 @@ class ReviewerAgent:
         Returns:
             A Review object with the critique and reliability assessment.
         """
-        return self._review_with_multi_llm(summary, url)
\ No newline at end of file
+        known = self.reputation_review(url)
+        if known is not None:
+            return known
+        review = self._review_with_multi_llm(summary, url)
+        self.record_outcome(url, review)
+        return review
+    
+    async def areview(self, summary: str, url: str) -> Review:
+        """Async variant of ``review``."""
+        known = self.reputation_review(url)
+        if known is not None:
+            return known
+        review = await self._areview_with_multi_llm(summary, url)
+        self.record_outcome(url, review)
+        return review
+
+    # --- Batch review ---
+    
+    def _build_batch_prompt(self, items: List[Tuple[str, str]]) -> str:
+        blocks = "".join(
+            f"[SOURCE {n}]\nSource URL: {url}\nSummary:\n---\n{summary}\n---\n\n"
+            for n, (summary, url) in enumerate(items, 1)
+        )
+        return f"{self.batch_system_prompt}\n\nPlease review the following {len(items)} summaries:\n\n{blocks}"
+    
+    def _batch_max_tokens(self, size: int) -> int:
+        return self.batch_tokens_per_source * size + 50
+    
+    def _fits(self, items: List[Tuple[str, str]]) -> bool:
+        if self._batch_max_tokens(len(items)) > self.batch_max_output_tokens:
+            return False
+        needed = count_tokens(self._build_batch_prompt(items)) + self._batch_max_tokens(len(items)) + 256
+        return needed <= self.multi_llm.context_window()
+    
+    def _plan_batches(self, items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Group consecutive items into batches that fit the size, output and context limits."""
+        batches, current = [], []
+        for item in items:
+            if current and (len(current) >= self.batch_size or not self._fits(current + [item])):
+                batches.append(current)
+                current = []
+            current.append(item)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _parse_batch_response(self, response_text: str, size: int) -> Dict[int, Review]:
+        """Reviews by 1-based source number; sources without a usable block are left out."""
+        reviews = {}
+        headings = list(re.finditer(r"^[\s\[#*]*SOURCE\s*(\d+)[\s\]*:]*$", response_text, re.IGNORECASE | re.MULTILINE))
+        for i, heading in enumerate(headings):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(response_text)
+            block = re.sub(r"\[/SOURCE\s*\d*\]", "", response_text[heading.end():end], flags=re.IGNORECASE).strip()
+            number = int(heading.group(1))
+            if 1 <= number <= size and number not in reviews and re.search(r"RELIABLE:", block, re.IGNORECASE):
+                reviews[number] = self.parse_review_response(block)
+        return reviews
+    
+    def _review_one(self, summary: str, url: str) -> Optional[Review]:
+        try:
+            return self._review_with_multi_llm(summary, url)
+        except Exception as e:
+            logger.error(f"Review failed for {url}: {e}")
+            return None
+    
+    def _review_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Review]]:
+        if len(items) == 1:
+            return [self._review_one(*items[0])]
+        logger.info(f"Reviewing {len(items)} summaries in one call")
+        try:
+            response = self.multi_llm.generate_with_fallback(
+                self._build_batch_prompt(items), max_tokens=self._batch_max_tokens(len(items)))
+        except Exception as e:
+            if not _is_size_error(e):
+                # Outages and rate limits would fail the halves too
+                logger.error(f"Batch review of {len(items)} summaries failed: {e}")
+                return [None] * len(items)
+            logger.warning(f"Batch review of {len(items)} summaries too large ({e}); splitting the batch")
+            return self._split_batch(items)
+        reviews = self._parse_batch_response(response, len(items))
+        if not reviews:
+            logger.warning(f"Batch review answer for {len(items)} summaries had no review blocks; splitting the batch")
+            return self._split_batch(items)
+        missing = [n for n in range(1, len(items) + 1) if n not in reviews]
+        if missing:
+            # Usually a truncated answer: re-review only what is missing
+            logger.warning(f"Batch review answer lacked {len(missing)}/{len(items)} reviews; retrying those")
+            retried = self._review_many([items[n - 1] for n in missing])
+            reviews.update(zip(missing, retried))
+        return [reviews[n] for n in range(1, len(items) + 1)]
+    
+    def _split_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Review]]:
+        half = len(items) // 2
+        return self._review_batch(items[:half]) + self._review_batch(items[half:])
+    
+    def _review_many(self, items: List[Tuple[str, str]]) -> List[Optional[Review]]:
+        batches = self._plan_batches(items)
+        results = bounded_map(self._review_batch, batches)
+        return [review for batch in results for review in batch]
+    
+    def review_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Review]]:
+        """
+        Reviews several summaries with as few LLM calls as possible.
+        
+        Args:
+            items: ``(summary, url)`` pairs.
+            
+        Returns:
+            One Review per item, in order; None where the item could not be
+            reviewed even on its own.
+        """
+        reviews = [self.reputation_review(url) for _, url in items]
+        pending = [i for i, review in enumerate(reviews) if review is None]
+        if pending:
+            for i, review in zip(pending, self._review_many([items[i] for i in pending])):
+                reviews[i] = review
+                self.record_outcome(items[i][1], review)
+        return reviews
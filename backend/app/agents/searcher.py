@@ -1,15 +1,144 @@
 # File: backend/app/agents/searcher.py
 
 import os
-from exa_py import Exa
-from typing import List, Dict
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from exa_py import Exa, AsyncExa
+from typing import List, Dict, Any, Optional, Callable, Iterator
+from ..core.cache import TieredCache, make_cache_key
+from ..core.singleflight import normalize_query
+from ..core.governor import governor
+from ..core.metrics import SEARCH_LATENCY, SEARCH_ERRORS, SEARCH_CACHE_HITS, SEARCH_CONTENT_CHARS
+from ..core.tracing import tracer
 import logging
 
 logger = logging.getLogger("orchestrateai.agent.searcher")
 
+FETCH_MODES = ("full", "bounded", "highlights")
+
+# Exa's own cap on text per result when none is requested
+DEFAULT_MAX_CHARS = 10000
+
 class SearcherAgent:
-    def __init__(self):
+    def __init__(self, char_budget: Optional[Callable[[], int]] = None):
         self.client = Exa(api_key=os.getenv("EXA_API_KEY"))
+        self.async_client = AsyncExa(api_key=os.getenv("EXA_API_KEY"))
+
+        # How much of each page is downloaded: "full" text, text "bounded" to
+        # `max_chars_per_result`, or query-relevant "highlights". Unless
+        # SEARCH_MAX_CHARS_PER_RESULT is set, the budget comes from
+        # `char_budget` (what the summarizer reads per source).
+        self.fetch_mode = os.getenv("SEARCH_FETCH_MODE", "bounded").lower()
+        if self.fetch_mode not in FETCH_MODES:
+            logger.warning(f"Unknown SEARCH_FETCH_MODE {self.fetch_mode!r}; using 'bounded'")
+            self.fetch_mode = "bounded"
+        self.max_chars_per_result = int(os.getenv("SEARCH_MAX_CHARS_PER_RESULT", "0"))
+        self.char_budget = char_budget
+        self.highlight_sentences = int(os.getenv("SEARCH_HIGHLIGHT_SENTENCES", "5"))
+        self.highlights_per_url = int(os.getenv("SEARCH_HIGHLIGHTS_PER_URL", "5"))
+
+        # Search cache: results younger than `cache_ttl` are served as-is; older
+        # ones are served stale for up to `cache_stale_ttl` more seconds while
+        # a background refresh fetches new results.
+        self.cache_enabled = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_ttl = float(os.getenv("SEARCH_CACHE_TTL", "21600"))
+        self.cache_stale_ttl = float(os.getenv("SEARCH_CACHE_STALE_TTL", "86400"))
+        self.cache = TieredCache(
+            "search",
+            ttl=self.cache_ttl + self.cache_stale_ttl,
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "500")),
+            disk_path=os.getenv("SEARCH_CACHE_PATH") or None,
+            max_disk_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(200 * 1024 * 1024))),
+        )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.revalidations = 0
+
+    normalize_query = staticmethod(normalize_query)
+
+    def max_chars(self) -> int:
+        """Characters of content kept per result in the bounded and highlights modes."""
+        if self.max_chars_per_result > 0:
+            return self.max_chars_per_result
+        if self.char_budget is not None:
+            return self.char_budget()
+        return DEFAULT_MAX_CHARS
+
+    def _contents_options(self, query: str) -> Dict[str, Any]:
+        """The contents request for the current fetch mode."""
+        if self.fetch_mode == "full":
+            return {"text": True}
+        if self.fetch_mode == "highlights":
+            # text=False, or the client adds its default 10k characters of text
+            return {"text": False, "highlights": {
+                "query": query,
+                "num_sentences": self.highlight_sentences,
+                "highlights_per_url": self.highlights_per_url,
+                "max_characters": self.max_chars(),
+            }}
+        return {"text": {"max_characters": self.max_chars()}}
+
+    def _to_result(self, r) -> Dict[str, Any]:
+        if self.fetch_mode == "highlights":
+            content = "\n".join(getattr(r, "highlights", None) or []) or (r.text or "")
+        else:
+            content = r.text or ""
+        if self.fetch_mode != "full":
+            # Enforced here too, in case the backend ignores the request
+            content = content[:self.max_chars()]
+        SEARCH_CONTENT_CHARS.inc(len(content), mode=self.fetch_mode)
+        return {"url": r.url, "title": r.title, "content": content}
+
+    def _cache_key(self, query: str, max_results: int) -> str:
+        budget = self.max_chars() if self.fetch_mode != "full" else 0
+        return make_cache_key("search", self.normalize_query(query), max_results, self.fetch_mode, budget)
+
+    def _cached_results(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        """Return cached results, scheduling a background refresh if they are stale."""
+        if not self.cache_enabled:
+            return None
+        entry = self.cache.get(self._cache_key(query, max_results))
+        if entry is None:
+            return None
+        SEARCH_CACHE_HITS.inc()
+        age = time.time() - entry["fetched_at"]
+        if age > self.cache_ttl:
+            logger.info(f"Serving stale search results for: {query} (age={age:.0f}s), refreshing in background")
+            self._revalidate(query, max_results)
+        else:
+            logger.info(f"Search cache hit for: {query}")
+        return entry["results"]
+
+    def _store_results(self, query: str, max_results: int, results: List[Dict]):
+        # Empty lists usually mean the search failed; don't pin them in the cache.
+        if self.cache_enabled and results:
+            self.cache.set(self._cache_key(query, max_results), {"results": results, "fetched_at": time.time()})
+
+    def _revalidate(self, query: str, max_results: int):
+        key = self._cache_key(query, max_results)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.revalidations += 1
+
+        def refresh():
+            try:
+                self._store_results(query, max_results, self._search_exa(query, max_results))
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="orchestrateai-search-refresh", daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache": self.cache.get_stats(),
+            "cache_enabled": self.cache_enabled,
+            "revalidations": self.revalidations,
+        }
 
     def search(self, query: str, max_results: int = 5) -> List[Dict]:
         """
@@ -22,20 +151,125 @@ class SearcherAgent:
         Returns:
             A list of search result dictionaries, each containing 'url', 'title', and 'content'.
         """
+        with tracer.span("search", kind="search", query=query, max_results=max_results) as span:
+            cached = self._cached_results(query, max_results)
+            if cached is not None:
+                span.set(cache="hit", results=len(cached))
+                return cached
+            results = self._search_exa(query, max_results)
+            span.set(cache="miss", results=len(results))
+            self._store_results(query, max_results, results)
+            return results
+
+    def _search_exa(self, query: str, max_results: int) -> List[Dict]:
         try:
             logger.info(f"Searching for: {query} (max_results={max_results})")
             # search_and_contents returns both metadata and cleaned HTML content
-            response = self.client.search_and_contents(
-                query,
-                num_results=max_results,
-                text=True, # Ensure text content is returned
-            )
+            with governor.slot("exa"), SEARCH_LATENCY.time():
+                response = self.client.search_and_contents(
+                    query,
+                    num_results=max_results,
+                    **self._contents_options(query),
+                )
             # Convert the Result objects into a simpler dictionary format
             logger.info(f"Found {len(response.results)} results for query: {query}")
-            return [
-                {"url": r.url, "title": r.title, "content": r.text}
-                for r in response.results
-            ]
+            return [self._to_result(r) for r in response.results]
+        except Exception as e:
+            SEARCH_ERRORS.inc()
+            logger.error(f"An error occurred during search: {e}")
+            return []
+
+    async def asearch(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Async variant of ``search`` using Exa's async client."""
+        with tracer.span("search", kind="search", query=query, max_results=max_results) as span:
+            cached = self._cached_results(query, max_results)
+            if cached is not None:
+                span.set(cache="hit", results=len(cached))
+                return cached
+            results = await self._asearch_exa(query, max_results)
+            span.set(cache="miss", results=len(results))
+            self._store_results(query, max_results, results)
+            return results
+
+    async def _asearch_exa(self, query: str, max_results: int) -> List[Dict]:
+        try:
+            logger.info(f"Searching for: {query} (max_results={max_results})")
+            async with governor.aslot("exa"):
+                with SEARCH_LATENCY.time():
+                    response = await self.async_client.search_and_contents(
+                        query,
+                        num_results=max_results,
+                        **self._contents_options(query),
+                    )
+            logger.info(f"Found {len(response.results)} results for query: {query}")
+            return [self._to_result(r) for r in response.results]
         except Exception as e:
+            SEARCH_ERRORS.inc()
             logger.error(f"An error occurred during search: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def iter_search(self, query: str, max_results: int = 5) -> Iterator[Dict]:
+        """
+        Incremental variant of ``search``: yields each result as soon as its
+        content has downloaded, so callers can start on the first page while
+        the others are still in flight.
+
+        Exa is asked for the ranked URLs first, then for every page's contents
+        in parallel; results are yielded in completion order and cached in
+        rank order. Cached results are yielded straight away.
+        """
+        with tracer.span("search", kind="search", query=query, max_results=max_results, incremental=True) as span:
+            cached = self._cached_results(query, max_results)
+            if cached is None:
+                hits = self._search_urls(query, max_results)
+                span.set(cache="miss", results=len(hits))
+            else:
+                span.set(cache="hit", results=len(cached))
+        # The span is closed before yielding so the caller's work is not recorded inside it
+        if cached is not None:
+            yield from cached
+            return
+        if not hits:
+            return
+
+        fetched: Dict[int, Dict] = {}
+        with ThreadPoolExecutor(max_workers=len(hits), thread_name_prefix="orchestrateai-fetch") as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._fetch_contents, query, hit): i
+                for i, hit in enumerate(hits)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    fetched[futures[future]] = result
+                    yield result
+        self._store_results(query, max_results, [fetched[i] for i in sorted(fetched)])
+
+    def _search_urls(self, query: str, max_results: int) -> List[Any]:
+        try:
+            logger.info(f"Searching for: {query} (max_results={max_results}, incremental)")
+            with governor.slot("exa"), SEARCH_LATENCY.time():
+                response = self.client.search(query, num_results=max_results, contents=False)
+            logger.info(f"Found {len(response.results)} results for query: {query}")
+            return list(response.results)
+        except Exception as e:
+            SEARCH_ERRORS.inc()
+            logger.error(f"An error occurred during search: {e}")
+            return []
+
+    def _fetch_contents(self, query: str, hit: Any) -> Optional[Dict]:
+        """The result dictionary for one search hit, or None if its contents could not be fetched."""
+        with tracer.span("search.fetch", kind="search", url=hit.url) as span:
+            try:
+                with governor.slot("exa"), SEARCH_LATENCY.time():
+                    response = self.client.get_contents([hit.url], **self._contents_options(query))
+            except Exception as e:
+                SEARCH_ERRORS.inc()
+                logger.error(f"Failed to fetch contents of {hit.url}: {e}")
+                return None
+            if not response.results:
+                return None
+            result = self._to_result(response.results[0])
+            result["title"] = result["title"] or hit.title
+            span.set(chars=len(result["content"]))
+            return result
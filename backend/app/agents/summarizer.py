@@ -1,45 +1,134 @@
 # File: backend/app/agents/summarizer.py
 import os
-from typing import List
+from typing import Callable, List, Optional
 from ..core.multi_llm import multi_llm_client
+from ..core.router import FASTEST
+from ..core.concurrency import bounded_map, abounded_map
+from ..core.chunking import chunk_text, group_by_tokens
+from ..core.tokens import count_tokens
 import logging
 
 logger = logging.getLogger("orchestrateai.agent.summarizer")
 
+# Summary size when neither SUMMARY_TARGET_TOKENS nor a writer budget is given
+DEFAULT_TARGET_TOKENS = 600
+
 class SummarizerAgent:
-    def __init__(self):
+    def __init__(self, target_budget: Optional[Callable[[], int]] = None):
         # Use multi-LLM client
         self.multi_llm = multi_llm_client
+        # Provider routing strategy for this agent's calls
+        self.routing_strategy = FASTEST
+
+        self.summary_max_tokens = 350
+        # Upper bound on a chunk even when the providers' context windows allow
+        # more; very large prompts are slow to process.
+        self.max_chunk_tokens = int(os.getenv("SUMMARY_MAX_CHUNK_TOKENS", "4000"))
+        self.chunk_overlap_tokens = int(os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "100"))
+        # Chunks of a page read per source; sizes the searcher's fetch budget
+        # so long pages still go through map-reduce.
+        self.max_chunks = max(1, int(os.getenv("SUMMARY_MAX_CHUNKS", "4")))
+        # Size the final per-source summary is reduced to; the writer receives
+        # one of these per accepted source. Unless SUMMARY_TARGET_TOKENS is
+        # set, it comes from `target_budget` (the writer's share per source).
+        self.max_target_tokens = int(os.getenv("SUMMARY_TARGET_TOKENS", "0"))
+        self.target_budget = target_budget
+
+    def _chunk_budget(self) -> int:
+        """Tokens of source text per call: the context window minus prompt, answer and a safety margin."""
+        overhead = count_tokens(self._build_prompt("", "")) + 256
+        available = self.multi_llm.context_window() - self.summary_max_tokens - overhead
+        return max(256, min(self.max_chunk_tokens, available))
+
+    def target_tokens(self) -> int:
+        """Tokens a long page's partial summaries are reduced to."""
+        if self.max_target_tokens > 0:
+            return self.max_target_tokens
+        if self.target_budget is not None:
+            return self.target_budget()
+        return DEFAULT_TARGET_TOKENS
+
+    def chunk_chars(self) -> int:
+        """Characters of source text one summarization call takes (~4 characters per token)."""
+        return self._chunk_budget() * 4
+
+    def source_chars(self) -> int:
+        """Characters of source text read per source: ``max_chunks`` chunks."""
+        return self.max_chunks * self.chunk_chars()
+
+    def _chunk_text(self, text: str) -> List[str]:
+        return chunk_text(text, self._chunk_budget(), self.chunk_overlap_tokens)
 
-    def _chunk_text(self, text: str, max_chunk_size: int = 2000) -> List[str]:
-        return [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
+    def _build_prompt(self, query, content):
+        return f"Original Query: {query}\n\nSource Text:\n---\n{content}\n---\n\nPlease provide a detailed synthesis of the above source, including key points, supporting details, and relevant facts. Do not overly compress; err on the side of completeness."
+
+    def _build_reduce_prompt(self, query, partial_summaries):
+        joined = "\n---\n".join(partial_summaries)
+        return f"Original Query: {query}\n\nPartial summaries of consecutive sections of one source:\n---\n{joined}\n---\n\nCombine these partial summaries into one detailed synthesis of the whole source. Keep key points, supporting details and relevant facts from every section; remove repetition."
 
     def _multi_llm_summarize(self, query, content):
-        prompt = f"Original Query: {query}\n\nSource Text:\n---\n{content}\n---\n\nPlease provide a detailed synthesis of the above source, including key points, supporting details, and relevant facts. Do not overly compress; err on the side of completeness."
-        
         # Use multi-LLM client with fallback
-        return self.multi_llm.generate_with_fallback(prompt, max_tokens=350)
+        return self.multi_llm.generate_with_fallback(self._build_prompt(query, content), max_tokens=self.summary_max_tokens, strategy=self.routing_strategy)
+
+    async def _amulti_llm_summarize(self, query, content):
+        return await self.multi_llm.agenerate_with_fallback(self._build_prompt(query, content), max_tokens=self.summary_max_tokens, strategy=self.routing_strategy)
+
+    def _multi_llm_combine(self, query, partial_summaries):
+        return self.multi_llm.generate_with_fallback(self._build_reduce_prompt(query, partial_summaries), max_tokens=self.summary_max_tokens, strategy=self.routing_strategy)
+
+    async def _amulti_llm_combine(self, query, partial_summaries):
+        return await self.multi_llm.agenerate_with_fallback(self._build_reduce_prompt(query, partial_summaries), max_tokens=self.summary_max_tokens, strategy=self.routing_strategy)
+
+    def _reduce_groups(self, summaries: List[str]) -> List[List[str]]:
+        groups = group_by_tokens(summaries, self._chunk_budget())
+        if len(groups) == len(summaries):
+            # Every summary fills a chunk on its own; merge pairwise so each round shrinks the list
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return groups
+
+    def _needs_reduce(self, summaries: List[str]) -> bool:
+        return len(summaries) > 1 and count_tokens("\n".join(summaries)) > self.target_tokens()
 
     def summarize(self, query: str, content: str) -> str:
         logger.info(f"Summarizing content for query: {query} (length={len(content)})")
-        # Truncate content to reasonable size first
-        max_content_length = 6000
-        if len(content) > max_content_length:
-            content = content[:max_content_length] + "..."
-        
+        chunks = self._chunk_text(content)
+
         # Use multi-LLM for summarization
-        if len(content) <= 2000:
-            summary = self._multi_llm_summarize(query, content)
+        if len(chunks) <= 1:
+            summary = self._multi_llm_summarize(query, chunks[0] if chunks else content)
+            logger.info(f"Summary complete for query: {query}")
+            return summary
+
+        # Map: summarize the chunks concurrently
+        logger.info(f"Summarizing {len(chunks)} chunks for query: {query}")
+        summaries = bounded_map(lambda chunk: self._multi_llm_summarize(query, chunk), chunks)
+
+        # Reduce: merge partial summaries level by level until they fit the target size
+        while self._needs_reduce(summaries):
+            groups = self._reduce_groups(summaries)
+            logger.info(f"Reducing {len(summaries)} partial summaries into {len(groups)} for query: {query}")
+            summaries = bounded_map(lambda group: self._multi_llm_combine(query, group), groups)
+
+        logger.info(f"All chunks summarized for query: {query}")
+        return "\n".join(summaries)
+
+    async def asummarize(self, query: str, content: str) -> str:
+        """Async variant of ``summarize``; chunk summaries are gathered concurrently."""
+        logger.info(f"Summarizing content for query: {query} (length={len(content)})")
+        chunks = self._chunk_text(content)
+
+        if len(chunks) <= 1:
+            summary = await self._amulti_llm_summarize(query, chunks[0] if chunks else content)
             logger.info(f"Summary complete for query: {query}")
             return summary
-        else:
-            # For longer content, chunk and summarize
-            chunks = self._chunk_text(content)
-            chunk_summaries = []
-            for idx, chunk in enumerate(chunks):
-                logger.info(f"Summarizing chunk {idx+1}/{len(chunks)} for query: {query}")
-                chunk_summary = self._multi_llm_summarize(query, chunk)
-                chunk_summaries.append(chunk_summary)
-            logger.info(f"All chunks summarized for query: {query}")
-            # Return the combined summaries without double processing
-            return "\n".join(chunk_summaries)
\ No newline at end of file
+
+        logger.info(f"Summarizing {len(chunks)} chunks for query: {query}")
+        summaries = await abounded_map(lambda chunk: self._amulti_llm_summarize(query, chunk), chunks)
+
+        while self._needs_reduce(summaries):
+            groups = self._reduce_groups(summaries)
+            logger.info(f"Reducing {len(summaries)} partial summaries into {len(groups)} for query: {query}")
+            summaries = await abounded_map(lambda group: self._amulti_llm_combine(query, group), groups)
+
+        logger.info(f"All chunks summarized for query: {query}")
+        return "\n".join(summaries)
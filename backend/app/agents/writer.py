@@ -1,7 +1,10 @@
 # File: backend/app/agents/writer.py
 import os
-from typing import List, Dict
+from typing import Any, List, Dict, Iterator, AsyncIterator, Tuple
 from ..core.multi_llm import multi_llm_client
+from ..core.router import RELIABLE
+from ..core.context_builder import build_research_context
+from ..core.tokens import count_tokens
 import logging
 
 logger = logging.getLogger("orchestrateai.agent.writer")
@@ -10,6 +13,17 @@ class WriterAgent:
     def __init__(self):
         # Use multi-LLM client
         self.multi_llm = multi_llm_client
+        # Provider routing strategy for this agent's calls
+        self.routing_strategy = RELIABLE
+        
+        self.report_max_tokens = 400
+        # Upper bound on research data per prompt; the context builder fills it
+        # with the most query-relevant summaries and excerpts first, so the
+        # 400-token report is written from the strongest material only.
+        self.max_context_tokens = int(os.getenv("WRITER_CONTEXT_MAX_TOKENS", "6000"))
+        # Accepted sources a report is usually written from: up to 3 plan
+        # tasks with 3 search results each.
+        self.expected_sources = max(1, int(os.getenv("WRITER_EXPECTED_SOURCES", "9")))
         
         self.system_prompt = (
             "You are an expert research report writer. Your goal is to synthesize the provided "
@@ -22,8 +36,21 @@ class WriterAgent:
             "Do not overly compress or summarize; provide a thorough synthesis."
         )
     
-    def _write_report_with_multi_llm(self, query: str, research_data_str: str):
-        """Write report using multi-LLM with fallback."""
+    def context_budget(self, query: str) -> int:
+        """Tokens of research data per prompt: the context window minus instructions, answer and a safety margin."""
+        overhead = count_tokens(self.system_prompt) + count_tokens(query) + 256
+        available = self.multi_llm.context_window() - self.report_max_tokens - overhead
+        return max(512, min(self.max_context_tokens, available))
+    
+    def source_budget(self) -> int:
+        """Tokens of research data per source when ``expected_sources`` share the context budget."""
+        return max(100, self.context_budget("") // self.expected_sources)
+    
+    def build_context(self, query: str, research_data: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Relevance-ranked research data that fits the context budget, plus what was dropped."""
+        return build_research_context(query, research_data, self.context_budget(query))
+    
+    def _build_prompt(self, query: str, research_data_str: str) -> str:
         logger.info(f"Writing final report for query: {query}")
         
         prompt = f"{self.system_prompt}\n\nOriginal Query: {query}\n\nResearch Data:\n---\n{research_data_str}\n---\n\nFinal Report:"
@@ -31,8 +58,15 @@ class WriterAgent:
         # Log context size for monitoring
         context_size = len(prompt)
         logger.info(f"Writer context size: {context_size} characters (~{context_size//4} tokens)")
-        
-        return self.multi_llm.generate_with_fallback(prompt, max_tokens=400)
+        return prompt
+    
+    def _write_report_with_multi_llm(self, query: str, research_data_str: str):
+        """Write report using multi-LLM with fallback."""
+        return self.multi_llm.generate_with_fallback(self._build_prompt(query, research_data_str), max_tokens=self.report_max_tokens, strategy=self.routing_strategy)
+    
+    async def _awrite_report_with_multi_llm(self, query: str, research_data_str: str):
+        """Async write report using multi-LLM with fallback."""
+        return await self.multi_llm.agenerate_with_fallback(self._build_prompt(query, research_data_str), max_tokens=self.report_max_tokens, strategy=self.routing_strategy)
     
     def write_report(self, query: str, research_data_str: str) -> str:
         """
@@ -45,4 +79,17 @@ class WriterAgent:
         Returns:
             A string containing the final report in Markdown format.
         """
-        return self._write_report_with_multi_llm(query, research_data_str)
\ No newline at end of file
+        return self._write_report_with_multi_llm(query, research_data_str)
+    
+    async def awrite_report(self, query: str, research_data_str: str) -> str:
+        """Async variant of ``write_report``."""
+        return await self._awrite_report_with_multi_llm(query, research_data_str)
+    
+    def stream_report(self, query: str, research_data_str: str) -> Iterator[str]:
+        """Generates the final research report as a stream of Markdown chunks."""
+        yield from self.multi_llm.stream_with_fallback(self._build_prompt(query, research_data_str), max_tokens=self.report_max_tokens, strategy=self.routing_strategy)
+    
+    async def astream_report(self, query: str, research_data_str: str) -> AsyncIterator[str]:
+        """Async variant of ``stream_report``."""
+        async for chunk in self.multi_llm.astream_with_fallback(self._build_prompt(query, research_data_str), max_tokens=self.report_max_tokens, strategy=self.routing_strategy):
+            yield chunk
@@ -1,26 +1,73 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from app.core.graph import research_graph
+from app.core.jobs import job_manager, QueueFullError, JobStateError, CANCELLED
+from app.core.tracing import tracer, summarize_trace
 
 router = APIRouter()
 
 class JobRequest(BaseModel):
     query: str
 
-@router.post("/jobs")
-def create_job(request: JobRequest):
+@router.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
     """
-    Synchronously runs the research graph for the given query and returns the final report and state.
-    (For production, this should be a background job with polling, but this is a minimal working version.)
+    Queues a research job and returns its ID immediately.
+    Poll GET /jobs/{job_id} for status and the final report.
     """
     try:
-        inputs = {"query": request.query}
-        # Run the graph and collect all states
-        states = list(research_graph.stream(inputs, stream_mode="values"))
-        final_state = states[-1]
-        return {
-            "final_report": final_state.get("final_report"),
-            "state": final_state
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Job failed: {e}") 
\ No newline at end of file
+        job = await job_manager.submit(request.query)
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "30"})
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Returns the job's status, progress and, once completed, the final report and state."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str):
+    """
+    Re-queues a failed, cancelled or interrupted job from its last checkpoint.
+    Finished planner, search and summary work is reused, not run again.
+    """
+    try:
+        job = await job_manager.resume(job_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QueueFullError as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "30"})
+    return {"job_id": job.id, "status": job.status, "resumes": job.resumes}
+
+@router.get("/jobs/{job_id}/trace")
+async def get_job_trace(job_id: str, spans: bool = False):
+    """
+    Returns the job's trace: the critical path of node, LLM and search spans
+    that determined its duration, time totals per span kind and, with
+    ?spans=true, every recorded span.
+    """
+    trace = tracer.get(job_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace for job {job_id}")
+    return summarize_trace(trace, include_spans=spans)
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancels a queued or running job. A job shared by identical queries keeps
+    running until every submission has cancelled it.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.finished and job.status != CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already {job.status}")
+    if not job.cancel_requested:
+        return {"job_id": job.id, "status": job.status, "detail": f"Detached; {job.waiters} other request(s) still waiting"}
+    return {"job_id": job.id, "status": CANCELLED}
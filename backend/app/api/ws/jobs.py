@@ -1,7 +1,5 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import asyncio
-import json
-from app.core.graph import execute_research_with_progress
+from app.core.jobs import job_manager, COMPLETED
 from app.utils.logger import logger
 
 router = APIRouter()
@@ -9,31 +7,31 @@ router = APIRouter()
 @router.websocket("/ws/jobs")
 async def websocket_job(websocket: WebSocket):
     await websocket.accept()
+    job = None
     try:
         data = await websocket.receive_json()
         query = data.get("query")
         logger.info(f"Received query: {query}")
 
-        async def send_progress(step, status, message=None, progress=None):
-            payload = {"step": step, "status": status}
-            if message:
-                payload["message"] = message
-            if progress is not None:
-                payload["progress"] = progress
-            await websocket.send_json(payload)
+        # Run the research graph as a job and stream its progress events and
+        # report tokens; identical in-flight queries share one job.
+        job = await job_manager.submit(query)
+        async for event in job_manager.subscribe(job):
+            await websocket.send_json(event)
 
-        # Call the async workflow and stream progress
-        final_report = None
-        async for update in execute_research_with_progress(query, send_progress):
-            if update.get("final_report"):
-                final_report = update["final_report"]
-        await websocket.send_json({"status": "complete", "final_report": final_report or ""})
+        if job.status == COMPLETED:
+            await websocket.send_json({"status": "complete", "final_report": job.final_report or ""})
+        else:
+            await websocket.send_json({"status": "error", "message": job.error or f"Job {job.status}"})
     except WebSocketDisconnect:
         print("WebSocket disconnected")
     except Exception as e:
         logger.error(f"Error in WebSocket: {e}")
         await websocket.send_json({"status": "error", "message": str(e)})
     finally:
+        if job is not None and not job.finished:
+            # Client went away: stop the job unless someone else is waiting on it
+            job_manager.cancel(job.id)
         # Gracefully close the connection if it's still open
         if websocket.client_state != "DISCONNECTED":
-            await websocket.close()
\ No newline at end of file
+            await websocket.close()
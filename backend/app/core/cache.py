@@ -0,0 +1,213 @@
+# File: backend/app/core/cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Content-addressed key: SHA-256 of the JSON encoding of ``parts``."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRUCache:
+    """Bounded in-memory LRU tier. Entries are (value, expires_at)."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, expires_at: float):
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class SQLiteCache:
+    """
+    On-disk tier that survives restarts. Values are stored as JSON; once the
+    table grows past ``max_bytes`` the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.evictions = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache(last_access)")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.get_first([key])
+        return None if entry is None else entry[1:]
+
+    def get_first(self, keys: List[str]) -> Optional[Tuple[str, Any, float]]:
+        """The first of ``keys`` with a live entry, as (key, value, expires_at), in one query."""
+        if not keys:
+            return None
+        now = time.time()
+        placeholders = ", ".join("?" * len(keys))
+        with self.lock, self.conn:
+            rows = {
+                key: (value, expires_at)
+                for key, value, expires_at in self.conn.execute(
+                    f"SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})", keys
+                )
+            }
+            expired = [key for key, (_, expires_at) in rows.items() if expires_at <= now]
+            if expired:
+                self.conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in expired])
+            key = next((key for key in keys if key in rows and key not in expired), None)
+            if key is None:
+                return None
+            self.conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+        value, expires_at = rows[key]
+        return key, json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, expires_at: float):
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), expires_at, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self.conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM cache ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Memory LRU tier in front of an optional SQLite tier, with TTLs and
+    hit/miss counters. Disk hits are promoted into memory.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1000,
+                 disk_path: Optional[str] = None, max_disk_bytes: int = 50 * 1024 * 1024):
+        self.name = name
+        self.ttl = ttl
+        self.memory = MemoryLRUCache(max_entries)
+        self.disk: Optional[SQLiteCache] = None
+        if disk_path:
+            try:
+                self.disk = SQLiteCache(disk_path, max_disk_bytes)
+            except Exception as e:
+                logger.warning(f"Failed to open {name} disk cache at {disk_path}: {e}")
+        self.stats_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self.get_first([key])
+        return None if hit is None else hit[1]
+
+    def get_first(self, keys: List[str]) -> Optional[Tuple[str, Any]]:
+        """
+        The first of ``keys`` that is cached, as (key, value). Counts as a
+        single lookup in the stats, and the disk tier is queried once.
+        """
+        for key in keys:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self._count("memory_hits")
+                return key, entry[0]
+
+        if self.disk is not None:
+            try:
+                hit = self.disk.get_first(keys)
+            except Exception as e:
+                logger.warning(f"{self.name} disk cache read failed: {e}")
+                hit = None
+            if hit is not None:
+                key, value, expires_at = hit
+                self.memory.set(key, value, expires_at)
+                self._count("disk_hits")
+                return key, value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self.memory.set(key, value, expires_at)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"{self.name} disk cache write failed: {e}")
+
+    def _count(self, field: str):
+        with self.stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.stats_lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "memory_evictions": self.memory.evictions,
+                "ttl": self.ttl,
+            }
+        if self.disk is not None:
+            stats["disk_path"] = self.disk.path
+            stats["disk_bytes"] = self.disk.size_bytes()
+            stats["disk_evictions"] = self.disk.evictions
+        return stats
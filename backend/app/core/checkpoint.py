@@ -0,0 +1,117 @@
+# File: backend/app/core/checkpoint.py
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+logger = logging.getLogger(__name__)
+
+# Non-builtin types kept in the research graph state
+ALLOWED_TYPES = [("app.agents.planner", "ResearchPlan")]
+
+# Offset between the UUID epoch (1582-10-15) and the Unix epoch, in 100 ns ticks
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """Unix time a checkpoint was written, read from its UUIDv6 ID."""
+    h = checkpoint_id.replace("-", "")
+    ticks = (int(h[0:8], 16) << 28) | (int(h[8:12], 16) << 12) | int(h[13:16], 16)
+    return (ticks - _UUID_EPOCH_OFFSET) / 1e7
+
+
+class CheckpointSaver(SqliteSaver):
+    """
+    LangGraph's SQLite checkpointer, usable from the async job runner too.
+
+    Storage is SqliteSaver's; its async methods are not implemented, so they
+    run the sync ones off the event loop (SQLite calls are short). Threads
+    (job IDs) whose last checkpoint is older than ``max_age`` seconds are
+    pruned when the store is opened and then at most every
+    ``prune_interval`` seconds via ``maybe_prune``.
+    """
+
+    def __init__(self, path: str, max_age: float = 0, prune_interval: float = 600):
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        super().__init__(
+            sqlite3.connect(path, check_same_thread=False),
+            serde=JsonPlusSerializer(allowed_msgpack_modules=ALLOWED_TYPES),
+        )
+        self.path = path
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self.last_pruned = 0.0
+        self.setup()
+        self.maybe_prune()
+
+    def prune_older_than(self, max_age: float) -> int:
+        """Delete threads whose last checkpoint is older than ``max_age`` seconds."""
+        cutoff = time.time() - max_age
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id")
+            stale = [thread_id for thread_id, last in cur.fetchall() if checkpoint_time(last) < cutoff]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        if stale:
+            logger.info(f"Pruned checkpoints of {len(stale)} old runs from {self.path}")
+        return len(stale)
+
+    def maybe_prune(self) -> int:
+        """Prune old threads unless that was done less than ``prune_interval`` ago."""
+        if self.max_age <= 0 or time.time() - self.last_pruned < self.prune_interval:
+            return 0
+        self.last_pruned = time.time()
+        return self.prune_older_than(self.max_age)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints")
+            threads, checkpoints = cur.fetchone()
+        return {"path": self.path, "runs": threads, "checkpoints": checkpoints}
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def create_checkpointer() -> Optional[CheckpointSaver]:
+    """The research graph's checkpointer, or None when checkpointing is disabled."""
+    if os.getenv("CHECKPOINT_ENABLED", "true").lower() != "true":
+        return None
+    path = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.db") or ":memory:"
+    max_age = float(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "72")) * 3600
+    try:
+        return CheckpointSaver(path, max_age=max_age)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Checkpoint store unavailable at {path}: {e}; keeping checkpoints in memory")
+        return CheckpointSaver(":memory:", max_age=max_age)
+
+
+# Global instance
+checkpointer = create_checkpointer()
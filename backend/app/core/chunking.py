@@ -0,0 +1,104 @@
+# File: backend/app/core/chunking.py
+import re
+from typing import List
+
+from app.core.tokens import count_tokens
+
+# Sentence ends: terminal punctuation (optionally followed by a closing quote
+# or bracket) and whitespace.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]?\s+")
+
+
+def _split_sentences(paragraph: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(paragraph) if s.strip()]
+
+
+def _split_oversized(sentence: str, max_tokens: int) -> List[str]:
+    """Hard-split a single sentence that does not fit in a chunk, on word boundaries."""
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        # Each word is counted once, plus one token for the joining space
+        word_tokens = count_tokens(word) + (1 if current else 0)
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+            word_tokens = count_tokens(word)
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Split ``text`` into chunks of at most ``max_tokens`` tokens.
+
+    Chunks break on paragraph boundaries when possible and otherwise on
+    sentence boundaries, so no sentence is cut in half unless it is longer
+    than a whole chunk. Each chunk after the first starts with up to
+    ``overlap_tokens`` tokens of trailing sentences from the previous chunk.
+    """
+    if not text or not text.strip():
+        return []
+    if count_tokens(text) <= max_tokens:
+        return [text.strip()]
+
+    # Units are sentences, with a paragraph marker so paragraphs stay together
+    # when they fit.
+    units: List[tuple] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        sentences = _split_sentences(paragraph)
+        for i, sentence in enumerate(sentences):
+            for piece in (_split_oversized(sentence, max_tokens) if count_tokens(sentence) > max_tokens else [sentence]):
+                units.append((piece, i == 0))
+
+    chunks: List[str] = []
+    current: List[tuple] = []
+    current_tokens = 0
+
+    def render(parts: List[tuple]) -> str:
+        out = ""
+        for sentence, starts_paragraph in parts:
+            if out:
+                out += "\n\n" if starts_paragraph else " "
+            out += sentence
+        return out
+
+    for unit in units:
+        unit_tokens = count_tokens(unit[0]) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append(render(current))
+            # Carry trailing sentences over as overlap
+            overlap: List[tuple] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                size = count_tokens(previous[0]) + 1
+                if overlap_size + size > overlap_tokens or overlap_size + size + unit_tokens > max_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += size
+            current, current_tokens = overlap, overlap_size
+        current.append(unit)
+        current_tokens += unit_tokens
+
+    if current:
+        chunks.append(render(current))
+    return chunks
+
+
+def group_by_tokens(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """Greedily pack ``texts`` (in order) into groups of at most ``max_tokens`` tokens."""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        size = count_tokens(text)
+        if current and current_tokens + size > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += size
+    if current:
+        groups.append(current)
+    return groups
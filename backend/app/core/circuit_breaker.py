@@ -0,0 +1,93 @@
+# File: backend/app/core/circuit_breaker.py
+import os
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"        # normal operation, requests flow
+OPEN = "open"            # provider considered down, requests are skipped
+HALF_OPEN = "half_open"  # recovery window, a single probe request is allowed
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is skipped because the provider's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and the
+    provider is skipped for ``recovery_timeout`` seconds. The circuit then goes
+    half-open and lets exactly one probe request through: a success closes the
+    circuit, a failure opens it again for another timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, recovery_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+        self.recovery_timeout = recovery_timeout or float(os.getenv("LLM_CIRCUIT_RECOVERY_TIMEOUT", "30"))
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.open_count = 0
+        self.skipped_count = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now (reserving the probe slot if half-open)."""
+        with self.lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.recovery_timeout:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                logger.info(f"🟡 Circuit for {self.name} half-open, probing recovery")
+
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+
+            self.skipped_count += 1
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info(f"🟢 Circuit for {self.name} closed after successful probe")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.open_count += 1
+                    logger.warning(f"🔴 Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures")
+                self.state = OPEN
+                self.opened_at = time.time()
+                self.probe_in_flight = False
+
+    def record_cancelled(self):
+        """Release the probe slot of a request that was abandoned before finishing."""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.recovery_timeout - (time.time() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_count": self.open_count,
+                "skipped_count": self.skipped_count,
+                "retry_in": retry_in,
+            }
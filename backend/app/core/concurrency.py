@@ -0,0 +1,55 @@
+# File: backend/app/core/concurrency.py
+import os
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Upper bound on LLM work items (search results, text chunks) processed at once
+# inside a single research task.
+DEFAULT_MAX_WORKERS = max(1, int(os.getenv("SUMMARY_MAX_WORKERS", "3")))
+
+
+def bounded_map(func: Callable[[T], R], items: Iterable[T], max_workers: int = DEFAULT_MAX_WORKERS) -> List[R]:
+    """
+    Apply ``func`` to every item using a bounded thread pool.
+
+    Results are returned in input order regardless of completion order, so
+    callers get the same output as a plain sequential loop. Each call runs in a
+    copy of the caller's context so context variables follow the work into the
+    pool threads.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers, len(items)))
+    if workers == 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orchestrateai-worker") as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, func, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+
+async def abounded_map(func: Callable[[T], Awaitable[R]], items: Iterable[T], max_workers: int = DEFAULT_MAX_WORKERS) -> List[R]:
+    """
+    Async counterpart of ``bounded_map``: awaits ``func`` for every item with at
+    most ``max_workers`` coroutines in flight, returning results in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
@@ -0,0 +1,169 @@
+# File: backend/app/core/context_builder.py
+import math
+import re
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from app.core.chunking import chunk_text
+from app.core.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "their this to was were what when where which who why will with".split()
+)
+
+# Excerpts rank below summaries of equal relevance: a summary covers the whole
+# source, an excerpt only backs it up.
+EXCERPT_WEIGHT = 0.5
+
+# Passage size when picking the most relevant excerpt of a page
+PASSAGE_TOKENS = 120
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in re.findall(r"\w+", (text or "").lower()) if w not in _STOPWORDS]
+
+
+class BM25:
+    """Okapi BM25 over a small in-memory corpus."""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(doc)) for doc in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_frequency: Counter = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def score(self, query: str, index: int) -> float:
+        counts = self.term_counts[index]
+        length_norm = 1 - self.b + self.b * (self.lengths[index] / self.avg_length if self.avg_length else 0.0)
+        score = 0.0
+        for term in set(tokenize(query)):
+            tf = counts.get(term)
+            if tf:
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return score
+
+
+def best_passages(text: str, query: str, max_chars: int) -> str:
+    """
+    The passages of ``text`` most relevant to ``query``, in their original
+    order, up to ``max_chars`` characters.
+    """
+    if not text or max_chars <= 0:
+        return ""
+    if len(text) <= max_chars:
+        return text.strip()
+    # Small enough that several passages fit in the excerpt
+    passages = chunk_text(text, max(30, min(PASSAGE_TOKENS, max_chars // 16)))
+    bm25 = BM25(passages)
+    ranked = sorted(range(len(passages)), key=lambda i: bm25.score(query, i), reverse=True)
+    chosen, used = [], 0
+    for i in ranked:
+        if used + len(passages[i]) > max_chars:
+            continue
+        chosen.append(i)
+        used += len(passages[i]) + 1
+    if not chosen:
+        return passages[ranked[0]][:max_chars]
+    return "\n".join(passages[i] for i in sorted(chosen))
+
+
+def _critique(item: Dict[str, Any]) -> str:
+    review = item.get("review", {})
+    if isinstance(review, dict):
+        return review.get("critique", "No critique available")
+    return str(review) if review else "No critique available"
+
+
+def _tasks(item: Dict[str, Any], default: str = "Unknown Task") -> str:
+    """The tasks a source answers: ``tasks`` when it was found by several, else ``task``."""
+    return "; ".join(item.get("tasks") or [item.get("task", default)])
+
+
+def build_research_context(query: str, research_data: List[Dict[str, Any]],
+                           budget_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pack the most relevant research material into ``budget_tokens`` tokens.
+
+    Every source contributes a summary unit (summary and review) and, when it
+    has one, an excerpt unit. Units are scored with BM25 against the query
+    plus the source's tasks and added best first while they fit; an excerpt is
+    only used if its source's summary made it in. Sources are rendered in
+    their original (plan) order. Returns the context and what was dropped.
+    """
+    sources = [item for item in research_data if isinstance(item, dict)]
+    if len(sources) != len(research_data):
+        logger.warning(f"Skipping {len(research_data) - len(sources)} non-dict research items")
+
+    # (source index, kind, text)
+    units: List[Tuple[int, str, str]] = []
+    for i, item in enumerate(sources):
+        units.append((i, "summary", (
+            f"Source: {item.get('url', 'Unknown URL')}\n"
+            f"Title: {item.get('title', 'Unknown')}\n"
+            f"Task: {_tasks(item)}\n"
+            f"Summary: {item.get('summary', 'No summary available')}\n"
+        )))
+        units.append((i, "review", f"Review: {_critique(item)}\n"))
+        if item.get("content"):
+            units.append((i, "excerpt", f"Excerpt: {item['content']}\n"))
+
+    # The review is scored and packed together with its summary
+    bm25 = BM25([text for _, _, text in units])
+    scored = []
+    for index, (i, kind, text) in enumerate(units):
+        if kind == "review":
+            continue
+        score = bm25.score(f"{query} {_tasks(sources[i], '')}", index)
+        if kind == "summary":
+            text += units[index + 1][2]
+        else:
+            score *= EXCERPT_WEIGHT
+        scored.append((score, i, kind, text))
+    scored.sort(key=lambda unit: unit[0], reverse=True)
+
+    selected: Dict[int, Dict[str, str]] = {}
+    used = 0
+    deferred = []
+    for _, i, kind, text in scored:
+        cost = count_tokens(text)
+        if used + cost > budget_tokens:
+            continue
+        if kind == "excerpt" and i not in selected:
+            # Its summary ranks lower; it may still be packed after it
+            deferred.append((i, text, cost))
+            continue
+        selected.setdefault(i, {})[kind] = text
+        used += cost
+    for i, text, cost in deferred:
+        if i in selected and used + cost <= budget_tokens:
+            selected[i]["excerpt"] = text
+            used += cost
+
+    context = "".join(
+        selected[i]["summary"] + selected[i].get("excerpt", "") + "---\n" for i in sorted(selected)
+    ) or "No research data available."
+
+    included_excerpts = sum(1 for chosen in selected.values() if "excerpt" in chosen)
+    stats = {
+        "sources": len(sources),
+        "included_sources": len(selected),
+        "included_excerpts": included_excerpts,
+        "dropped_sources": [sources[i].get("url", "Unknown URL") for i in range(len(sources)) if i not in selected],
+        "dropped_excerpts": sum(1 for _, i, kind, _ in scored if kind == "excerpt") - included_excerpts,
+        "tokens": used,
+        "budget_tokens": budget_tokens,
+    }
+    return context, stats
@@ -0,0 +1,188 @@
+# File: backend/app/core/dedup.py
+import os
+import re
+import random
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only identify the referrer or campaign.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "cmpid", "ocid", "_ga", "_gl", "smid", "spm", "amp",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Google AMP cache: https://www-example-com.cdn.ampproject.org/c/s/www.example.com/path
+AMP_CACHE_PATH = re.compile(r"^/[a-z](?:/s)?/(?P<host>[^/]+)(?P<path>/.*)?$")
+
+SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.8"))
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a URL to a canonical form so trivially different links to the same
+    page compare equal: lower-case host without ``www.``/``amp.``/``m.``,
+    no default port, no fragment, no tracking parameters, no AMP path
+    variants, no trailing slash and sorted query parameters.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip().lower()
+
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+
+    if host.endswith(".cdn.ampproject.org"):
+        match = AMP_CACHE_PATH.match(path)
+        if match:
+            host = match.group("host").lower()
+            path = match.group("path") or "/"
+
+    for prefix in ("www.", "amp.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    path = re.sub(r"/amp/?$", "/", path)
+    path = re.sub(r"\.amp(\.html?)?$", r"\1", path)
+    path = re.sub(r"/{2,}", "/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    return urlunsplit(("https", netloc, path, urlencode(sorted(query)), ""))
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles. The estimated Jaccard similarity of
+    two documents is the fraction of signature slots that agree.
+    """
+
+    MERSENNE_PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, max_chars: int = 20000, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_chars = max_chars
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, self.MERSENNE_PRIME), rng.randrange(0, self.MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def _shingles(self, text: str) -> set:
+        words = re.findall(r"\w+", text[:self.max_chars].lower())
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        shingles = self._shingles(text or "")
+        if not shingles:
+            return None
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+        prime = self.MERSENNE_PRIME
+        return tuple(min((a * h + b) % prime for h in hashes) for a, b in self.permutations)
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class SourceDeduplicator:
+    """
+    Tracks the sources seen so far in a job and reports whether a new search
+    result is a repeat: same canonical URL or near-identical content. Safe to
+    share between threads.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, hasher: Optional[MinHasher] = None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.seen_urls: Dict[str, str] = {}
+        self.signatures: List[Tuple[Tuple[int, ...], str]] = []
+        self.lock = threading.Lock()
+
+    def duplicate_of(self, result: Dict[str, Any]) -> Optional[str]:
+        """Return the URL of the earlier copy of ``result``, or None and remember it."""
+        url = result.get("url", "")
+        canonical = canonicalize_url(url)
+        with self.lock:
+            if canonical and canonical in self.seen_urls:
+                return self.seen_urls[canonical]
+        # Hashing is the slow part; it runs outside the lock
+        signature = self.hasher.signature(result.get("content") or "")
+        with self.lock:
+            return self._check(url, canonical, signature)
+
+    def _check(self, url: str, canonical: str, signature: Optional[Tuple[int, ...]]) -> Optional[str]:
+        # Results without a URL can only be matched on content
+        if canonical and canonical in self.seen_urls:
+            return self.seen_urls[canonical]
+
+        if signature is not None:
+            for seen_signature, seen_url in self.signatures:
+                if MinHasher.similarity(signature, seen_signature) >= self.threshold:
+                    if canonical:
+                        self.seen_urls[canonical] = seen_url
+                    return seen_url
+            self.signatures.append((signature, url))
+
+        if canonical:
+            self.seen_urls[canonical] = url
+        return None
+
+
+def deduplicate_results(task_results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Remove repeated sources across tasks, keeping the first occurrence in plan
+    order.
+
+    ``task_results`` is a list of ``{"task", "task_index", "results"}`` entries.
+    Returns the same structure with duplicates moved from ``results`` to
+    ``duplicates`` as ``{"url", "original"}`` references, so the original's
+    summary and review can be reused for that task, plus counters.
+    """
+    deduplicator = SourceDeduplicator()
+    stats = {"total": 0, "kept": 0, "url_duplicates": 0, "content_duplicates": 0}
+    unique = []
+
+    for entry in sorted(task_results, key=lambda e: e["task_index"]):
+        kept = []
+        duplicates = list(entry.get("duplicates", []))
+        for result in entry.get("results", []):
+            stats["total"] += 1
+            original = deduplicator.duplicate_of(result)
+            if original is None:
+                kept.append(result)
+                continue
+            canonical = canonicalize_url(result.get("url", ""))
+            if canonical and canonicalize_url(original) == canonical:
+                stats["url_duplicates"] += 1
+            else:
+                stats["content_duplicates"] += 1
+            duplicates.append({"url": result.get("url", ""), "original": original})
+            logger.info(f"    - Skipping duplicate source {result.get('url')} (same as {original})")
+        stats["kept"] += len(kept)
+        unique.append({**entry, "results": kept, "duplicates": duplicates})
+
+    return unique, stats
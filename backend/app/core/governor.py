@@ -0,0 +1,282 @@
+# File: backend/app/core/governor.py
+import os
+import time
+import asyncio
+import threading
+import contextvars
+import logging
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# The job an outbound call belongs to. Set by whoever runs a research job;
+# calls made outside a job are only subject to the per-resource limits.
+current_job_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_job_id", default=None)
+
+
+@contextmanager
+def job_context(job_id: str):
+    """Attribute every governed call made inside the block to ``job_id``."""
+    token = current_job_id.set(job_id)
+    try:
+        yield
+    finally:
+        current_job_id.reset(token)
+
+
+class AdmissionError(Exception):
+    """Raised when the governor will not admit a call."""
+
+
+class QueueFullError(AdmissionError):
+    """The resource's wait queue is at its maximum depth."""
+
+
+class AdmissionTimeoutError(AdmissionError):
+    """The call waited longer than the admission timeout."""
+
+
+class OverloadedError(AdmissionError):
+    """Every provider that could serve a call turned it away (queue full or wait timed out)."""
+
+
+class _Waiter:
+    def __init__(self, job_id: Optional[str], loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.job_id = job_id
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class _ResourceStats:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_waiting = 0
+
+
+class Governor:
+    """
+    Process-wide admission control for outbound calls (LLM providers, Exa).
+
+    Each resource has a concurrency limit (``GOVERNOR_<NAME>_CONCURRENCY``,
+    default ``GOVERNOR_PROVIDER_CONCURRENCY``) and each job a cap on its calls
+    in flight across all resources (``GOVERNOR_JOB_CONCURRENCY``). Calls that
+    cannot start wait in a FIFO queue per resource; the queue is bounded
+    (``GOVERNOR_MAX_WAITERS``) and waits time out (``GOVERNOR_WAIT_TIMEOUT``),
+    both surfacing as ``AdmissionError``. Threads and coroutines share the
+    same queues.
+    """
+
+    def __init__(self, default_limit: Optional[int] = None, job_limit: Optional[int] = None,
+                 max_waiters: Optional[int] = None, wait_timeout: Optional[float] = None):
+        self.default_limit = default_limit or int(os.getenv("GOVERNOR_PROVIDER_CONCURRENCY", "4"))
+        self.job_limit = job_limit or int(os.getenv("GOVERNOR_JOB_CONCURRENCY", "6"))
+        self.max_waiters = max_waiters or int(os.getenv("GOVERNOR_MAX_WAITERS", "100"))
+        self.wait_timeout = wait_timeout or float(os.getenv("GOVERNOR_WAIT_TIMEOUT", "60"))
+        self.lock = threading.Lock()
+        self.limits: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.job_in_flight: Dict[str, int] = {}
+        self.waiters: Dict[str, Deque[_Waiter]] = {}
+        self.stats: Dict[str, _ResourceStats] = {}
+
+    def set_limit(self, resource: str, limit: int):
+        with self.lock:
+            self.limits[resource] = max(1, limit)
+            self._dispatch()
+
+    def _limit(self, resource: str) -> int:
+        if resource not in self.limits:
+            env_name = f"GOVERNOR_{resource.upper()}_CONCURRENCY"
+            self.limits[resource] = max(1, int(os.getenv(env_name, str(self.default_limit))))
+        return self.limits[resource]
+
+    def _stats(self, resource: str) -> _ResourceStats:
+        return self.stats.setdefault(resource, _ResourceStats())
+
+    # --- Bookkeeping (callers hold self.lock) ---
+
+    def _can_admit(self, resource: str, job_id: Optional[str]) -> bool:
+        if self.in_flight.get(resource, 0) >= self._limit(resource):
+            return False
+        return job_id is None or self.job_in_flight.get(job_id, 0) < self.job_limit
+
+    def _admit(self, resource: str, job_id: Optional[str]):
+        self.in_flight[resource] = self.in_flight.get(resource, 0) + 1
+        if job_id is not None:
+            self.job_in_flight[job_id] = self.job_in_flight.get(job_id, 0) + 1
+        self._stats(resource).admitted += 1
+
+    def _dispatch(self):
+        """Grant free slots to waiters, oldest first. A waiter held back only by
+        its job's cap does not block waiters from other jobs."""
+        for resource, queue in self.waiters.items():
+            for waiter in list(queue):
+                if self.in_flight.get(resource, 0) >= self._limit(resource):
+                    break
+                if self._can_admit(resource, waiter.job_id):
+                    queue.remove(waiter)
+                    self._admit(resource, waiter.job_id)
+                    waiter.granted = True
+                    self._record_wait(resource, waiter)
+                    waiter.wake()
+
+    def _record_wait(self, resource: str, waiter: _Waiter):
+        stats = self._stats(resource)
+        wait = time.monotonic() - waiter.enqueued_at
+        stats.waited += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+    def _try_admit_or_enqueue(self, resource: str, job_id: Optional[str],
+                              loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Waiter]:
+        """Admit immediately (returns None) or enqueue a waiter."""
+        with self.lock:
+            queue = self.waiters.setdefault(resource, deque())
+            if not queue and self._can_admit(resource, job_id):
+                self._admit(resource, job_id)
+                return None
+            if len(queue) >= self.max_waiters:
+                self._stats(resource).rejected += 1
+                raise QueueFullError(f"{resource}: {len(queue)} calls already waiting")
+            waiter = _Waiter(job_id, loop)
+            queue.append(waiter)
+            stats = self._stats(resource)
+            stats.peak_waiting = max(stats.peak_waiting, len(queue))
+            # Waiters ahead may only be held back by their own job's cap
+            self._dispatch()
+            return None if waiter.granted else waiter
+
+    def _abandon(self, resource: str, waiter: _Waiter, cancelled: bool = False) -> bool:
+        """Drop a waiter that gave up. Returns True if it was granted in the meantime."""
+        with self.lock:
+            if waiter.granted:
+                return True
+            self.waiters[resource].remove(waiter)
+            stats = self._stats(resource)
+            if cancelled:
+                stats.cancelled += 1
+            else:
+                stats.timed_out += 1
+            return False
+
+    # --- Public API ---
+
+    def acquire(self, resource: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Block until a call to ``resource`` may start. Returns the job ID it was charged to."""
+        job_id = current_job_id.get()
+        waiter = self._try_admit_or_enqueue(resource, job_id)
+        if waiter is None:
+            return job_id
+        timeout = self.wait_timeout if timeout is None else timeout
+        if not waiter.event.wait(timeout) and not self._abandon(resource, waiter):
+            raise AdmissionTimeoutError(f"{resource}: no slot within {timeout:.1f}s")
+        return job_id
+
+    async def aacquire(self, resource: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Async variant of ``acquire``."""
+        job_id = current_job_id.get()
+        waiter = self._try_admit_or_enqueue(resource, job_id, asyncio.get_running_loop())
+        if waiter is None:
+            return job_id
+        timeout = self.wait_timeout if timeout is None else timeout
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(resource, waiter):
+                raise AdmissionTimeoutError(f"{resource}: no slot within {timeout:.1f}s")
+        except asyncio.CancelledError:
+            if self._abandon(resource, waiter, cancelled=True):
+                self.release(resource, job_id)
+            raise
+        return job_id
+
+    def release(self, resource: str, job_id: Optional[str]):
+        with self.lock:
+            self.in_flight[resource] = max(0, self.in_flight.get(resource, 0) - 1)
+            if job_id is not None:
+                remaining = self.job_in_flight.get(job_id, 0) - 1
+                if remaining > 0:
+                    self.job_in_flight[job_id] = remaining
+                else:
+                    self.job_in_flight.pop(job_id, None)
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, resource: str):
+        """Hold one of ``resource``'s concurrency slots for the duration of the block."""
+        job_id = self.acquire(resource)
+        try:
+            yield
+        finally:
+            self.release(resource, job_id)
+
+    @asynccontextmanager
+    async def aslot(self, resource: str):
+        """Async variant of ``slot``."""
+        job_id = await self.aacquire(resource)
+        try:
+            yield
+        finally:
+            self.release(resource, job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            resources = {}
+            for resource in sorted(set(self.stats) | set(self.in_flight)):
+                stats = self._stats(resource)
+                resources[resource] = {
+                    "limit": self._limit(resource),
+                    "in_flight": self.in_flight.get(resource, 0),
+                    "waiting": len(self.waiters.get(resource, ())),
+                    "peak_waiting": stats.peak_waiting,
+                    "admitted": stats.admitted,
+                    "rejected": stats.rejected,
+                    "timed_out": stats.timed_out,
+                    "cancelled": stats.cancelled,
+                    "avg_wait": round(stats.total_wait / stats.waited, 3) if stats.waited else 0.0,
+                    "max_wait": round(stats.max_wait, 3),
+                }
+            return {
+                "job_limit": self.job_limit,
+                "max_waiters": self.max_waiters,
+                "wait_timeout": self.wait_timeout,
+                "jobs_in_flight": dict(self.job_in_flight),
+                "resources": resources,
+            }
+
+    def in_flight_by_resource(self) -> Dict[tuple, int]:
+        with self.lock:
+            return {(resource,): count for resource, count in self.in_flight.items()}
+
+    def waiting_by_resource(self) -> Dict[tuple, int]:
+        with self.lock:
+            return {(resource,): len(queue) for resource, queue in self.waiters.items()}
+
+
+# Global instance
+governor = Governor()
+metrics.GOVERNOR_IN_FLIGHT.set_function(governor.in_flight_by_resource)
+metrics.GOVERNOR_WAITING.set_function(governor.waiting_by_resource)
@@ -1,11 +1,17 @@
 import os
-from typing import List, TypedDict, Annotated, Dict, Any
+from typing import List, TypedDict, Annotated, Dict, Any, Optional
 import operator
+import functools
 import logging
-import time
-import asyncio
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+from langgraph.config import get_stream_writer
 from pydantic import BaseModel
 
 # Import your agent classes
@@ -14,13 +20,40 @@ from app.agents.searcher import SearcherAgent
 from app.agents.summarizer import SummarizerAgent
 from app.agents.reviewer import ReviewerAgent, Review
 from app.agents.writer import WriterAgent
-from app.core.rate_limiter import rate_limiter
+from app.agents.analyst import AnalystAgent
 from app.core.multi_llm import multi_llm_client
+from app.core.concurrency import bounded_map, DEFAULT_MAX_WORKERS as SUMMARY_MAX_WORKERS
+from app.core.dedup import deduplicate_results, canonicalize_url, SourceDeduplicator
+from app.core.context_builder import best_passages
+from app.core.reputation import domain_reputation, BLOCKED
+from app.core.singleflight import SingleFlight, normalize_query
+from app.core.governor import governor, job_context, current_job_id
+from app.core.metrics import NODE_LATENCY, NODE_ERRORS, REPUTATION_DECISIONS
+from app.core.tracing import tracer
+from app.core.checkpoint import checkpointer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("orchestrateai.graph")
 
+# Maximum number of plan tasks researched concurrently. Set to 1 to research
+# the tasks one after the other, as the graph used to.
+MAX_PARALLEL_TASKS = max(1, int(os.getenv("RESEARCH_MAX_PARALLEL_TASKS", "3")))
+
+# Characters of each accepted source kept as an excerpt for the writer
+WRITER_EXCERPT_CHARS = int(os.getenv("WRITER_EXCERPT_CHARS", "2000"))
+
+# Fused mode: one LLM call summarizes and reviews each source, instead of a
+# summary call followed by a review of that summary.
+SUMMARY_REVIEW_FUSED = os.getenv("SUMMARY_REVIEW_FUSED", "false").lower() == "true"
+
+# Incremental mode: each searcher branch summarizes and reviews its results
+# as their pages arrive, instead of after every search has finished.
+SEARCH_INCREMENTAL = os.getenv("SEARCH_INCREMENTAL", "false").lower() == "true"
+
+# Identical queries that arrive while one is already running share its result
+research_flight = SingleFlight("research")
+
 # --- 1. Define the State for the Graph ---
 # The state is a dictionary that will be passed between nodes.
 # It holds all the information gathered during the research process.
@@ -29,37 +62,99 @@ class GraphState(TypedDict):
     """State for the research graph."""
     query: str
     plan: ResearchPlan
-    current_task_index: int
-    search_results: List[Dict[str, Any]]
-    research_data: List[Dict[str, Any]]
+    # Each searcher branch appends {"task", "task_index", "results"}; the
+    # reducer merges the parallel branches.
+    search_results: Annotated[List[Dict[str, Any]], operator.add]
+    # Search results per task after cross-task deduplication, with references
+    # to the sources skipped as duplicates of another task's.
+    unique_results: List[Dict[str, Any]]
+    # Each summarize & review branch appends its reviewed sources; the reducer
+    # merges the parallel branches in plan order.
+    research_data: Annotated[List[Dict[str, Any]], operator.add]
     final_report: str
     error: str
 
 
+class TaskState(TypedDict):
+    """State handed to a single task branch by the fan-out steps."""
+    query: str
+    task: str
+    task_index: int
+    results: List[Dict[str, Any]]
+
+
+def timed_node(name: str):
+    """Record each node run as a trace span and in the /metrics histograms."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(state):
+            attributes = {"task_index": state["task_index"]} if "task_index" in state else {}
+            with tracer.span(name, kind="node", **attributes) as span, NODE_LATENCY.time(node=name):
+                try:
+                    result = func(state)
+                except Exception:
+                    NODE_ERRORS.inc(node=name)
+                    raise
+                if isinstance(result, dict) and result.get("error"):
+                    NODE_ERRORS.inc(node=name)
+                    span.set(error=result["error"])
+            return result
+        return wrapper
+    return decorator
+
+
 # --- 2. Instantiate Agents ---
 # Create single instances of our agents to be used by the nodes.
 
 planner_agent = PlannerAgent()
-searcher_agent = SearcherAgent()
-summarizer_agent = SummarizerAgent()
-reviewer_agent = ReviewerAgent()
 writer_agent = WriterAgent()
+# Long pages are summarized down to the writer's share per source
+summarizer_agent = SummarizerAgent(target_budget=writer_agent.source_budget)
+# Pages are fetched up to what the summarizer reads per source
+searcher_agent = SearcherAgent(char_budget=summarizer_agent.source_chars)
+reviewer_agent = ReviewerAgent()
+analyst_agent = AnalystAgent(summarizer_agent, reviewer_agent)
+
+
+# Incremental mode deduplicates results as they arrive, against everything
+# the run has seen so far. Keyed by job ID (the query when there is none).
+_run_deduplicators: "OrderedDict[str, SourceDeduplicator]" = OrderedDict()
+_run_deduplicators_lock = threading.Lock()
+MAX_RUN_DEDUPLICATORS = 256
+
+def _run_key(state) -> str:
+    return current_job_id.get() or normalize_query(state["query"])
+
+def run_deduplicator(state, reset: bool = False) -> SourceDeduplicator:
+    key = _run_key(state)
+    with _run_deduplicators_lock:
+        deduplicator = None if reset else _run_deduplicators.get(key)
+        if deduplicator is None:
+            deduplicator = _run_deduplicators[key] = SourceDeduplicator()
+            while len(_run_deduplicators) > MAX_RUN_DEDUPLICATORS:
+                _run_deduplicators.popitem(last=False)
+        return deduplicator
+
+def release_run_deduplicator(state):
+    with _run_deduplicators_lock:
+        _run_deduplicators.pop(_run_key(state), None)
 
 
 # --- 3. Define the Node Functions ---
 # Each node in the graph is a function that takes the current state
 # and returns a dictionary with the values to update in the state.
 
+@timed_node("planner")
 def planner_node(state: GraphState) -> dict:
     """Planner node that creates a research plan."""
     try:
         logger.info("--- 📝 Executing Planner Node ---")
         plan = planner_agent.create_plan(state["query"])
         logger.info(f"Plan created with {len(plan.plan)} tasks.")
+        if SEARCH_INCREMENTAL:
+            run_deduplicator(state, reset=True)
         return {
             "plan": plan,
-            "current_task_index": 0,
-            "search_results": [],
             "research_data": [],
             "final_report": "",
             "error": ""
@@ -68,122 +163,250 @@ def planner_node(state: GraphState) -> dict:
         logger.error(f"Planner node failed: {e}")
         return {"error": f"Planner node failed: {e}"}
 
-def searcher_node(state: GraphState) -> dict:
-    """Searcher node that finds relevant information."""
+def accept_source(task: str, result: Dict[str, Any], summary: str, review: Optional[Review]) -> Optional[Dict[str, Any]]:
+    """The research data entry for a reviewed source, or None if it is discarded."""
+    if review is None:
+        return None
+    if not review.is_reliable:
+        logger.warning(f"    - Discarding unreliable source: {result['url']}")
+        return None
+    logger.info(f"    - Source accepted: {result['url']}")
+    return {
+        "url": result["url"],
+        "title": result.get("title", "Unknown"),
+        "summary": summary,
+        # The passages most relevant to the task, for the writer
+        "content": best_passages(result["content"], task, WRITER_EXCERPT_CHARS),
+        "review": review.dict(),
+        "task": task
+    }
+
+def reuse_duplicate_sources(research_data: List[Dict[str, Any]],
+                            unique_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Research data with each accepted source also credited to the tasks whose
+    copy of it was skipped as a duplicate; its summary and review are reused.
+    """
+    accepted = {canonicalize_url(item["url"]): i for i, item in enumerate(research_data)}
+    merged = list(research_data)
+    for entry in unique_results or []:
+        for duplicate in entry.get("duplicates", []):
+            i = accepted.get(canonicalize_url(duplicate["original"]))
+            if i is None:
+                continue  # the original was discarded or failed
+            tasks = merged[i].get("tasks") or [merged[i]["task"]]
+            if entry["task"] not in tasks:
+                merged[i] = {**merged[i], "tasks": tasks + [entry["task"]]}
+    return merged
+
+def summarize_result(task: str, result: Dict[str, Any]) -> Optional[str]:
+    """Summarize one search result; returns None if summarization failed."""
     try:
-        current_task = state["plan"].plan[state["current_task_index"]]
-        logger.info(f"--- 🔍 Executing Searcher Node for Task {state['current_task_index'] + 1} ---")
-        logger.info(f"Searching for: {current_task}")
-        
-        # Request more links from Exa (e.g., 3)
-        search_results = searcher_agent.search(current_task, max_results=3)
-        
-        logger.info(f"Found {len(search_results)} search results.")
-        return {"search_results": search_results}
+        logger.info(f"    - Summarizing URL: {result['url']}")
+        return summarizer_agent.summarize(task, result["content"])
     except Exception as e:
-        logger.error(f"Searcher node failed: {e}")
-        return {"error": f"Searcher node failed: {e}"}
+        logger.error(f"    - Error processing {result['url']}: {e}")
+        return None
 
-def summarize_and_review_node(state: GraphState) -> dict:
-    """Combined summarize and review node for efficiency."""
+def summarize_and_review_result(task: str, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Summarize and review one search result; returns None if it is discarded."""
     try:
-        logger.info(f"--- 📖 Executing Summarize & Review Node for Task {state['current_task_index'] + 1} ---")
-        
-        reviewed_summaries = []
-        
-        search_results = state.get("search_results", [])
-        current_task = state["plan"].plan[state["current_task_index"]]
-        
-        for i, result in enumerate(search_results):
-            logger.info(f"    - Processing result {i+1}/{len(search_results)}: {result['url']}")
-            
-            try:
-                # Summarize the content
-                logger.info(f"    - Summarizing URL: {result['url']}")
-                summary = summarizer_agent.summarize(current_task, result["content"])
-                
-                # Review the summary
-                logger.info(f"    - Reviewing Summary for: {result['url']}")
-                review = reviewer_agent.review(summary, result["url"])
-                
-                if review.is_reliable:
-                    logger.info(f"    - Source accepted: {result['url']}")
-                    reviewed_summaries.append({
-                        "url": result["url"],
-                        "title": result.get("title", "Unknown"),
-                        "summary": summary,
-                        "review": review.dict(),
-                        "task": current_task
-                    })
-                else:
-                    logger.warning(f"    - Discarding unreliable source: {result['url']}")
-                    
-            except Exception as e:
-                logger.error(f"    - Error processing {result['url']}: {e}")
+        summary = summarize_result(task, result)
+        if summary is None:
+            return None
+
+        # Review the summary
+        logger.info(f"    - Reviewing Summary for: {result['url']}")
+        review = reviewer_agent.review(summary, result["url"])
+        return accept_source(task, result, summary, review)
+    except Exception as e:
+        logger.error(f"    - Error processing {result['url']}: {e}")
+    return None
+
+def analyze_result(task: str, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Summarize and review one search result in a single fused call; returns None if it is discarded."""
+    try:
+        logger.info(f"    - Analyzing URL: {result['url']}")
+        summary, review = analyst_agent.analyze(task, result["content"], result["url"])
+        return accept_source(task, result, summary, review)
+    except Exception as e:
+        logger.error(f"    - Error processing {result['url']}: {e}")
+    return None
+
+def is_blocked(result: Dict[str, Any]) -> bool:
+    """Whether the result's domain is blocked by reputation; counted in the metrics."""
+    if domain_reputation.verdict(result["url"]) is not BLOCKED:
+        return False
+    REPUTATION_DECISIONS.inc(decision="blocked")
+    logger.info(f"    - Skipping result from blocked domain: {result['url']}")
+    return True
+
+def summarize_and_review_results(task: str, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Summarize every search result on a bounded worker pool and review the
+    summaries, keeping only reliable sources in search-result order.
+
+    Results from blocked domains are dropped first, and the reviewer skips
+    the LLM for trusted ones (see app/core/reputation.py). In fused mode
+    (SUMMARY_REVIEW_FUSED) each result takes one call. With batch reviews
+    enabled (REVIEW_BATCH_SIZE > 1) the task's summaries are reviewed
+    together in as few calls as possible; otherwise each result runs its own
+    summarize -> review chain.
+    """
+    # Known-bad domains are dropped before any tokens are spent on them
+    search_results = [result for result in search_results if not is_blocked(result)]
+
+    logger.info(f"    - Processing {len(search_results)} results (max workers: {SUMMARY_MAX_WORKERS})")
+    if SUMMARY_REVIEW_FUSED:
+        reviewed = bounded_map(
+            lambda result: analyze_result(task, result),
+            search_results,
+            max_workers=SUMMARY_MAX_WORKERS,
+        )
+    elif reviewer_agent.batch_size > 1 and len(search_results) > 1:
+        summaries = bounded_map(
+            lambda result: summarize_result(task, result),
+            search_results,
+            max_workers=SUMMARY_MAX_WORKERS,
+        )
+        summarized = [(result, summary) for result, summary in zip(search_results, summaries) if summary is not None]
+        logger.info(f"    - Reviewing {len(summarized)} summaries in batches of up to {reviewer_agent.batch_size}")
+        reviews = reviewer_agent.review_batch([(summary, result["url"]) for result, summary in summarized])
+        reviewed = [
+            accept_source(task, result, summary, review)
+            for (result, summary), review in zip(summarized, reviews)
+        ]
+    else:
+        reviewed = bounded_map(
+            lambda result: summarize_and_review_result(task, result),
+            search_results,
+            max_workers=SUMMARY_MAX_WORKERS,
+        )
+    return [item for item in reviewed if item is not None]
+
+def search_and_analyze(state: TaskState) -> List[Dict[str, Any]]:
+    """
+    Incremental mode: search for a task and summarize and review each result
+    as soon as its page has downloaded, keeping only reliable sources.
+
+    Duplicates of sources already seen in this run and blocked domains are
+    skipped on arrival. Each result runs its own summarize -> review (or
+    fused) chain, since the batch review would have to wait for all of them.
+    Returns the reviewed sources and ``{"url", "original"}`` references to
+    the skipped duplicates.
+    """
+    task = state["task"]
+    process = analyze_result if SUMMARY_REVIEW_FUSED else summarize_and_review_result
+    deduplicator = run_deduplicator(state)
+    duplicates = []
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS, thread_name_prefix="orchestrateai-worker") as executor:
+        pending = []
+        for result in searcher_agent.iter_search(task, max_results=3):
+            original = deduplicator.duplicate_of(result)
+            if original is not None:
+                duplicates.append({"url": result["url"], "original": original})
+                logger.info(f"    - Skipping duplicate source {result['url']} (same as {original})")
                 continue
-        
-        # Update the overall research data with the findings from this task
-        logger.info(f"Task {state['current_task_index'] + 1} complete. Waiting 1 second before next task...")
-        logger.info(f"Adding {len(reviewed_summaries)} reviewed summaries to research data")
-        
-        # Manually accumulate research data
-        existing_research_data = state.get("research_data", [])
-        updated_research_data = existing_research_data + reviewed_summaries
-        logger.info(f"Total research data items: {len(updated_research_data)}")
-        
-        time.sleep(1)  # Reduced delay - rate limiter handles timing
+            if is_blocked(result):
+                continue
+            logger.info(f"    - Page arrived, processing: {result['url']}")
+            pending.append(executor.submit(contextvars.copy_context().run, process, task, result))
+        reviewed = [future.result() for future in pending]
+    return [item for item in reviewed if item is not None], duplicates
+
+@timed_node("searcher")
+def searcher_node(state: TaskState) -> dict:
+    """Map step: search the web for a single plan task."""
+    task_number = state["task_index"] + 1
+    if SEARCH_INCREMENTAL:
+        try:
+            logger.info(f"--- 🔍 Executing Searcher Node for Task {task_number} (incremental) ---")
+            research_data, duplicates = search_and_analyze(state)
+            logger.info(f"Task {task_number} complete. Adding {len(research_data)} reviewed summaries to research data")
+        except Exception as e:
+            logger.error(f"Searcher node failed for task {task_number}: {e}")
+            research_data, duplicates = [], []
+        # The results are already processed; the summarize & review branch has nothing left to do
         return {
-            "research_data": updated_research_data,
-            "current_task_index": state["current_task_index"] + 1
+            "search_results": [{"task": state["task"], "task_index": state["task_index"], "results": [],
+                                "duplicates": duplicates}],
+            "research_data": research_data,
         }
+    try:
+        current_task = state["task"]
+        logger.info(f"--- 🔍 Executing Searcher Node for Task {task_number} ---")
+        logger.info(f"Searching for: {current_task}")
+
+        # Request more links from Exa (e.g., 3)
+        search_results = searcher_agent.search(current_task, max_results=3)
+        logger.info(f"Found {len(search_results)} search results for task {task_number}.")
+    except Exception as e:
+        # A failed search only loses this task's sources
+        logger.error(f"Searcher node failed for task {task_number}: {e}")
+        search_results = []
+    return {"search_results": [{"task": state["task"], "task_index": state["task_index"], "results": search_results}]}
+
+@timed_node("deduplicate")
+def deduplicate_node(state: GraphState) -> dict:
+    """Set aside sources already found by another task (same canonical URL or near-identical text)."""
+    logger.info("--- 🧹 Executing Deduplicate Node ---")
+    unique_results, stats = deduplicate_results(state.get("search_results", []))
+    logger.info(
+        f"Kept {stats['kept']}/{stats['total']} search results "
+        f"({stats['url_duplicates']} duplicate URLs, {stats['content_duplicates']} near-duplicate pages)."
+    )
+    return {"unique_results": unique_results}
+
+@timed_node("summarize_and_review")
+def summarize_and_review_node(state: TaskState) -> dict:
+    """Map step: summarize and review the deduplicated results of a single plan task."""
+    task_number = state["task_index"] + 1
+    try:
+        logger.info(f"--- 📖 Executing Summarize & Review Node for Task {task_number} ---")
+        reviewed_summaries = summarize_and_review_results(state["task"], state.get("results", []))
+        logger.info(f"Task {task_number} complete. Adding {len(reviewed_summaries)} reviewed summaries to research data")
+        return {"research_data": reviewed_summaries}
     except Exception as e:
-        logger.error(f"Summarize & Review node failed: {e}")
-        return {"error": f"Summarize & Review node failed: {e}"}
+        # A failed task only loses its own sources; the other branches still
+        # reach the writer.
+        logger.error(f"Summarize & Review node failed for task {task_number}: {e}")
+        return {"research_data": []}
 
+@timed_node("writer")
 def writer_node(state: GraphState) -> dict:
     """Writer node that creates the final report."""
     try:
         logger.info("--- ✍️ Executing Writer Node ---")
         
-        # Debug: Log the research data structure
-        logger.info(f"Research data type: {type(state['research_data'])}")
-        logger.info(f"Research data length: {len(state['research_data'])}")
-        if state['research_data']:
-            logger.info(f"First item type: {type(state['research_data'][0])}")
-            logger.info(f"First item keys: {list(state['research_data'][0].keys()) if isinstance(state['research_data'][0], dict) else 'Not a dict'}")
-        
-        # Prepare research data for the writer
-        research_data_str = ""
-        for item in state["research_data"]:
-            try:
-                if isinstance(item, dict):
-                    url = item.get('url', 'Unknown URL')
-                    task = item.get('task', 'Unknown Task')
-                    summary = item.get('summary', 'No summary available')
-                    content_excerpt = item.get('content', '')[:2000]  # Add a large excerpt from the source
-                    # Handle review data safely
-                    review_data = item.get('review', {})
-                    if isinstance(review_data, dict):
-                        critique = review_data.get('critique', 'No critique available')
-                    else:
-                        critique = str(review_data) if review_data else 'No critique available'
-                    research_data_str += f"Source: {url}\n"
-                    research_data_str += f"Task: {task}\n"
-                    research_data_str += f"Summary: {summary}\n"
-                    research_data_str += f"Excerpt: {content_excerpt}\n"
-                    research_data_str += f"Review: {critique}\n"
-                    research_data_str += "---\n"
-                else:
-                    logger.warning(f"Skipping non-dict item: {type(item)}")
-            except Exception as item_error:
-                logger.error(f"Error processing research item: {item_error}")
-                continue
-        
-        if not research_data_str.strip():
-            research_data_str = "No research data available."
+        # Rank the accepted sources against the query and pack the best of
+        # them into the writer's context budget; sources found by several
+        # tasks are credited to all of them
+        research_data = reuse_duplicate_sources(state["research_data"], state.get("unique_results"))
+        with tracer.span("writer.context", kind="internal") as span:
+            research_data_str, context_stats = writer_agent.build_context(state["query"], research_data)
+            span.set(**context_stats)
+        logger.info(
+            f"Writer context: {context_stats['included_sources']}/{context_stats['sources']} sources, "
+            f"{context_stats['included_excerpts']} excerpts, "
+            f"{context_stats['tokens']}/{context_stats['budget_tokens']} tokens."
+        )
+        if context_stats["dropped_sources"] or context_stats["dropped_excerpts"]:
+            logger.info(
+                f"Dropped {len(context_stats['dropped_sources'])} sources and "
+                f"{context_stats['dropped_excerpts']} excerpts over budget: {context_stats['dropped_sources']}"
+            )
         
-        final_report = writer_agent.write_report(state["query"], research_data_str)
+        # Stream the report so streaming callers (stream_mode="custom") get
+        # tokens as they are generated; other callers just see the result.
+        stream_writer = get_stream_writer()
+        report_chunks = []
+        for chunk in writer_agent.stream_report(state["query"], research_data_str):
+            report_chunks.append(chunk)
+            stream_writer({"token": chunk})
+        final_report = "".join(report_chunks)
         logger.info("Final report written.")
+        if SEARCH_INCREMENTAL:
+            release_run_deduplicator(state)
         
         return {"final_report": final_report}
     except Exception as e:
@@ -193,23 +416,35 @@ def writer_node(state: GraphState) -> dict:
 def error_node(state: GraphState) -> dict:
     error_msg = state.get('error', 'Unknown error')
     logger.error(f"Workflow halted due to error: {error_msg}")
+    if SEARCH_INCREMENTAL:
+        release_run_deduplicator(state)
     return {"final_report": f"ERROR: {error_msg}"}
 
 # --- 4. Define Conditional Logic ---
-# This function decides which node to run next based on the current state.
-
-def should_continue(state: GraphState) -> str:
-    """Determine if we should continue to the next task or finish."""
-    try:
-        if state["current_task_index"] < len(state["plan"].plan):
-            logger.info("    - More tasks remaining. Looping back to searcher.")
-            return "continue"
-        else:
-            logger.info("    - All tasks complete. Proceeding to writer.")
-            return "finish"
-    except Exception as e:
-        logger.error(f"Error in should_continue: {e}")
-        return "finish"
+# These functions fan the plan out into one branch per sub-task.
+
+def dispatch_searches(state: GraphState):
+    """Send every plan task to its own searcher branch, or route to the error node."""
+    if state.get("error"):
+        return "error"
+    tasks = state["plan"].plan
+    logger.info(f"    - Fanning out {len(tasks)} searches (max parallelism: {MAX_PARALLEL_TASKS}).")
+    return [
+        Send("searcher", {"query": state["query"], "task": task, "task_index": i, "results": []})
+        for i, task in enumerate(tasks)
+    ]
+
+def dispatch_reviews(state: GraphState):
+    """Send each task's deduplicated results to its own summarize & review branch."""
+    return [
+        Send("summarize_and_review", {
+            "query": state["query"],
+            "task": entry["task"],
+            "task_index": entry["task_index"],
+            "results": entry["results"],
+        })
+        for entry in state["unique_results"]
+    ]
 
 
 # --- 5. Build the Graph ---
@@ -220,6 +455,7 @@ workflow = StateGraph(GraphState)
 # Add nodes to the graph
 workflow.add_node("planner", planner_node)
 workflow.add_node("searcher", searcher_node)
+workflow.add_node("deduplicate", deduplicate_node)
 workflow.add_node("summarize_and_review", summarize_and_review_node)
 workflow.add_node("writer", writer_node)
 workflow.add_node("error", error_node)
@@ -228,43 +464,67 @@ workflow.add_node("error", error_node)
 workflow.set_entry_point("planner")
 
 # Add edges to define the flow
-workflow.add_edge("planner", "searcher")
-workflow.add_edge("searcher", "summarize_and_review")
-workflow.add_edge("writer", END) # The writer node is the final step
+workflow.add_conditional_edges("planner", dispatch_searches, ["searcher", "error"])
+workflow.add_edge("searcher", "deduplicate")  # Waits for every search branch
+workflow.add_conditional_edges("deduplicate", dispatch_reviews, ["summarize_and_review"])
+workflow.add_edge("summarize_and_review", "writer")  # Reducer step: waits for every branch
 workflow.add_edge("error", END)
 
-# Add the conditional edge for the research loop
-workflow.add_conditional_edges(
-    "summarize_and_review",
-    should_continue,
-    {
-        "continue": "searcher",
-        "finish": "writer",
-        "error": "error",
-    }
-)
-
 # Add conditional edges for error handling
-workflow.add_conditional_edges(
-    "planner",
-    lambda state: "error" if state.get("error") else "searcher",
-    {"searcher": "searcher", "error": "error"}
-)
-
-workflow.add_conditional_edges(
-    "searcher",
-    lambda state: "error" if state.get("error") else "summarize_and_review",
-    {"summarize_and_review": "summarize_and_review", "error": "error"}
-)
-
 workflow.add_conditional_edges(
     "writer",
     lambda state: "error" if state.get("error") else END,
     {END: END, "error": "error"}
 )
 
-# Compile the graph into a runnable object
-research_graph = workflow.compile()
+# Compile the graph into a runnable object. The checkpointer saves every
+# step under the run's job ID (see run_config) so failed runs can resume.
+compiled_graph = workflow.compile(checkpointer=checkpointer)
+research_graph = compiled_graph.with_config(max_concurrency=MAX_PARALLEL_TASKS)
+if checkpointer is not None:
+    # Each step is saved before the next one starts, so a crash loses at most the running step
+    research_graph = research_graph.bind(durability="sync")
+
+
+# --- 6. Checkpoints and Resume ---
+
+def run_config(job_id: str) -> Dict[str, Any]:
+    """Graph config that checkpoints a run under its job ID."""
+    return {"configurable": {"thread_id": job_id}}
+
+def resume_point(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Where a failed or interrupted run continues from: the newest checkpoint
+    that still has work to do and no error, as ``{"config", "values",
+    "next"}``. None if the run finished successfully or has no checkpoints.
+
+    Resuming from it replays nothing that had completed: finished nodes are
+    behind it, and the saved outputs of branches that finished in its step
+    are reused, so only the failed or interrupted work runs again.
+    """
+    if checkpointer is None:
+        return None
+    for i, snapshot in enumerate(compiled_graph.get_state_history(run_config(job_id))):
+        if snapshot.values.get("error") or "error" in snapshot.next:
+            continue
+        if not snapshot.next:
+            return None  # completed
+        # An interrupted run continues its latest step, with the outputs its
+        # finished branches saved; an earlier step is forked from instead,
+        # which re-runs the step that failed.
+        config = run_config(job_id) if i == 0 else snapshot.config
+        return {"config": config, "values": snapshot.values, "next": snapshot.next}
+    return None
+
+def discard_checkpoints(job_id: str):
+    """Drop a run's checkpoints once they are no longer needed."""
+    if checkpointer is not None:
+        checkpointer.delete_thread(job_id)
+
+def prune_checkpoints():
+    """Drop the checkpoints of runs older than CHECKPOINT_MAX_AGE_HOURS (rate-limited)."""
+    if checkpointer is not None:
+        checkpointer.maybe_prune()
 
 
 # This allows you to run `python graph.py` to test the entire flow.
@@ -278,7 +538,7 @@ if __name__ == "__main__":
     }
 
     # Stream the graph's execution and print the output of each step
-    for output in research_graph.stream(inputs, stream_mode="values"):
+    for output in research_graph.stream(inputs, run_config(uuid.uuid4().hex), stream_mode="values"):
         # The 'stream_mode="values"' yields the entire state object at each step
         print("\n" + "="*80)
         print("CURRENT STATE:")
@@ -289,129 +549,43 @@ if __name__ == "__main__":
         print("="*80 + "\n")
 
     # The final state contains the report
-    final_report = list(research_graph.stream(inputs, stream_mode="values"))[-1]['final_report']
+    final_report = list(research_graph.stream(inputs, run_config(uuid.uuid4().hex), stream_mode="values"))[-1]['final_report']
     print("\n--- ✅ FINAL REPORT ---")
     print(final_report)
 
 def execute_research(query: str) -> Dict[str, Any]:
-    """Execute the research workflow."""
+    """
+    Execute the research workflow. The result carries the run's ``job_id``,
+    under which a failed run can be resumed from its checkpoints.
+    """
     try:
-        # Log rate limiter stats at start
-        stats = rate_limiter.get_stats()
-        logger.info(f"Starting research with rate limiter stats: {stats}")
-        
-        # Log multi-LLM stats at start
+        # Log multi-LLM stats at start, including each provider's rate limiter
         llm_stats = multi_llm_client.get_stats()
+        logger.info(f"Starting research with rate limiter stats: {llm_stats['rate_limits']}")
         logger.info(f"Starting research with multi-LLM stats: {llm_stats}")
         
-        result = research_graph.invoke({"query": query})
+        def run():
+            # Charge the run's LLM and search calls to one job in the governor
+            # and record them under one trace
+            job_id = uuid.uuid4().hex
+            with job_context(job_id), tracer.trace(job_id, query=query):
+                result = research_graph.invoke({"query": query}, run_config(job_id))
+            if result.get("error"):
+                logger.warning(f"Research run {job_id} failed; resume it with POST /api/v1/jobs/{job_id}/resume")
+            else:
+                discard_checkpoints(job_id)
+            return {**result, "job_id": job_id}
         
-        # Log final rate limiter stats
-        final_stats = rate_limiter.get_stats()
-        logger.info(f"Research completed. Final rate limiter stats: {final_stats}")
+        result = research_flight.do(normalize_query(query), run)
         
-        # Log final multi-LLM stats
+        # Log final multi-LLM and rate limiter stats
         final_llm_stats = multi_llm_client.get_stats()
+        logger.info(f"Research completed. Final rate limiter stats: {final_llm_stats['rate_limits']}")
         logger.info(f"Research completed. Final multi-LLM stats: {final_llm_stats}")
+        logger.info(f"Research completed. Search stats: {searcher_agent.get_stats()}")
+        logger.info(f"Research completed. Governor stats: {governor.get_stats()}")
         
         return result
     except Exception as e:
         logger.error(f"Research execution failed: {e}")
         return {"error": str(e)}
-
-# --- ASYNC PROGRESS WORKFLOW ---
-async def execute_research_with_progress(query: str, send_progress):
-    """
-    Async generator that runs the workflow step by step, sending progress after each agent step.
-    Yields after each step for WebSocket streaming.
-    """
-    state = {"query": query}
-    try:
-        # 1. Planner
-        logger.info("--- 📝 Executing Planner Node ---")
-        plan = planner_agent.create_plan(query)
-        logger.info(f"Plan created with {len(plan.plan)} tasks.")
-        state["plan"] = plan
-        state["current_task_index"] = 0
-        state["search_results"] = []
-        state["research_data"] = []
-        state["final_report"] = ""
-        state["error"] = ""
-        await send_progress("planner", "complete", "Planner finished", 25)
-        yield {"step": "planner", "status": "complete"}
-
-        # 2. Searcher
-        logger.info("--- 🔍 Executing Searcher Node for Task 1 ---")
-        current_task = plan.plan[0]
-        # Request more links from Exa (e.g., 3)
-        search_results = searcher_agent.search(current_task, max_results=3)
-        logger.info(f"Found {len(search_results)} search results.")
-        state["search_results"] = search_results
-        await send_progress("searcher", "complete", "Searcher finished", 50)
-        yield {"step": "searcher", "status": "complete"}
-
-        # 3. Summarizer & Reviewer
-        logger.info(f"--- 📖 Executing Summarize & Review Node for Task 1 ---")
-        reviewed_summaries = []
-        for i, result in enumerate(search_results):
-            logger.info(f"    - Processing result {i+1}/{len(search_results)}: {result['url']}")
-            try:
-                logger.info(f"    - Summarizing URL: {result['url']}")
-                summary = summarizer_agent.summarize(current_task, result["content"])
-                logger.info(f"    - Reviewing Summary for: {result['url']}")
-                review = reviewer_agent.review(summary, result["url"])
-                if review.is_reliable:
-                    logger.info(f"    - Source accepted: {result['url']}")
-                    reviewed_summaries.append({
-                        "url": result["url"],
-                        "title": result.get("title", "Unknown"),
-                        "summary": summary,
-                        "review": review.dict(),
-                        "task": current_task
-                    })
-                else:
-                    logger.warning(f"    - Discarding unreliable source: {result['url']}")
-            except Exception as e:
-                logger.error(f"    - Error processing {result['url']}: {e}")
-                continue
-        state["research_data"] = reviewed_summaries
-        await send_progress("summarizer", "complete", "Summarizer & Reviewer finished", 75)
-        yield {"step": "summarizer", "status": "complete"}
-
-        # 4. Writer
-        logger.info("--- ✍️ Executing Writer Node ---")
-        research_data_str = ""
-        for item in reviewed_summaries:
-            try:
-                if isinstance(item, dict):
-                    url = item.get('url', 'Unknown URL')
-                    task = item.get('task', 'Unknown Task')
-                    summary = item.get('summary', 'No summary available')
-                    content_excerpt = item.get('content', '')[:2000]  # Add a large excerpt from the source
-                    review_data = item.get('review', {})
-                    if isinstance(review_data, dict):
-                        critique = review_data.get('critique', 'No critique available')
-                    else:
-                        critique = str(review_data) if review_data else 'No critique available'
-                    research_data_str += f"Source: {url}\n"
-                    research_data_str += f"Task: {task}\n"
-                    research_data_str += f"Summary: {summary}\n"
-                    research_data_str += f"Excerpt: {content_excerpt}\n"
-                    research_data_str += f"Review: {critique}\n"
-                    research_data_str += "---\n"
-                else:
-                    logger.warning(f"Skipping non-dict item: {type(item)}")
-            except Exception as item_error:
-                logger.error(f"Error processing research item: {item_error}")
-                continue
-        if not research_data_str.strip():
-            research_data_str = "No research data available."
-        final_report = writer_agent.write_report(query, research_data_str)
-        state["final_report"] = final_report
-        await send_progress("writer", "complete", "Writer finished", 100)
-        yield {"step": "writer", "status": "complete", "final_report": final_report}
-    except Exception as e:
-        logger.error(f"Workflow failed: {e}")
-        await send_progress("error", "error", str(e), 0)
-        yield {"step": "error", "status": "error", "message": str(e)}
-        
\ No newline at end of file
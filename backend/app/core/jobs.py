@@ -0,0 +1,400 @@
+# File: backend/app/core/jobs.py
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.singleflight import normalize_query
+from app.core.governor import job_context
+from app.core.tracing import tracer
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Marks the end of a job's event stream for subscribers
+_END = object()
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobStateError(Exception):
+    """Raised when a job cannot be resumed in its current state."""
+
+
+class Job:
+    """A research job and everything a client may poll for."""
+
+    def __init__(self, query: str, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.query = query
+        self.key = normalize_query(query)
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.final_report: Optional[str] = None
+        self.state: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.progress: List[Dict[str, Any]] = []
+        # Every event (progress and report tokens), replayed to late subscribers
+        self.events: List[Dict[str, Any]] = []
+        self.subscribers: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Task] = None
+        # Submissions sharing this job; it is only cancelled when all detach
+        self.waiters = 1
+        self.cancel_requested = False
+        # Checkpoint a resumed job continues from, and its state at that point
+        self.resume_config: Optional[Dict[str, Any]] = None
+        self.resume_values: Dict[str, Any] = {}
+        self.resumes = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "waiters": self.waiters,
+        }
+        if self.resumes:
+            data["resumes"] = self.resumes
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.status == COMPLETED:
+            data["final_report"] = self.final_report
+            data["state"] = self.state
+        return data
+
+
+class ProgressTracker:
+    """
+    Turns graph node updates into progress events. Percentages come from the
+    number of node runs the plan implies: one planner, one searcher and one
+    summarize & review branch per task, deduplication and the writer.
+    """
+
+    MESSAGES = {
+        "planner": "Planner finished",
+        "searcher": "Searcher finished",
+        "deduplicate": "Deduplication finished",
+        "summarize_and_review": "Summarizer & Reviewer finished",
+        "writer": "Writer finished",
+    }
+
+    def __init__(self):
+        self.tasks: Optional[int] = None
+        self.reviews: Optional[int] = None
+        self.completed: Dict[str, int] = {}
+
+    def resume_from(self, values: Dict[str, Any]):
+        """Pick up the task counts of a run resumed from a checkpoint."""
+        if values.get("plan") is not None:
+            self.tasks = len(values["plan"].plan)
+        if values.get("unique_results") is not None:
+            self.reviews = len(values["unique_results"])
+
+    def expected(self, node: str) -> int:
+        tasks = self.tasks or 1
+        if node == "searcher":
+            return tasks
+        if node == "summarize_and_review":
+            return self.reviews if self.reviews is not None else tasks
+        return 1
+
+    def update(self, node: str, update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        update = update or {}
+        if node == "error":
+            return {"step": "error", "status": "error", "message": update.get("final_report") or "Unknown error", "progress": 0}
+        if update.get("error"):
+            # The node caught its own failure; the error node reports it next
+            return {"step": node, "status": "error", "message": update["error"], "progress": 0}
+        if node == "planner" and update.get("plan") is not None:
+            self.tasks = len(update["plan"].plan)
+        elif node == "deduplicate":
+            self.reviews = len(update.get("unique_results", []))
+
+        self.completed[node] = self.completed.get(node, 0) + 1
+        done, expected = self.completed[node], self.expected(node)
+        total = sum(self.expected(n) for n in self.MESSAGES)
+        event = {
+            "step": node,
+            "status": "complete" if done >= expected else "running",
+            "message": self.MESSAGES.get(node, node) if done >= expected else f"{done}/{expected} tasks finished",
+            "progress": 100 if node == "writer" else min(99, round(100 * sum(self.completed.values()) / total)),
+        }
+        return event
+
+
+class JobManager:
+    """
+    In-process job queue drained by a fixed pool of asyncio workers.
+
+    Each worker drives ``research_graph.astream`` for one job at a time; the
+    graph's synchronous nodes run in LangGraph's thread pool, so the event loop
+    stays free for HTTP and WebSocket traffic. Submissions beyond
+    ``max_queue`` waiting jobs are rejected with ``QueueFullError``.
+
+    A submission whose normalized query matches a queued or running job is
+    attached to that job instead of starting another run.
+    """
+
+    def __init__(self, graph=None, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 history_limit: Optional[int] = None):
+        self.graph = graph
+        self.max_workers = max_workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_queue = max_queue or int(os.getenv("JOB_QUEUE_SIZE", "20"))
+        self.history_limit = history_limit or int(os.getenv("JOB_HISTORY_LIMIT", "200"))
+        self.jobs: Dict[str, Job] = {}
+        self.inflight: Dict[str, Job] = {}
+        self.coalesced = 0
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+    def _get_graph(self):
+        if self.graph is None:
+            # Imported lazily: building the graph instantiates every agent
+            from app.core.graph import research_graph
+            self.graph = research_graph
+        return self.graph
+
+    def _ensure_workers(self):
+        """Start the worker pool on the running event loop the first time it is needed."""
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        self.workers = [w for w in self.workers if not w.done()]
+        while len(self.workers) < self.max_workers:
+            index = len(self.workers)
+            self.workers.append(asyncio.create_task(self._worker(index), name=f"orchestrateai-job-worker-{index}"))
+
+    def queue_depth(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == QUEUED)
+
+    def active_jobs(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == RUNNING)
+
+    async def submit(self, query: str) -> Job:
+        self._ensure_workers()
+        existing = self.inflight.get(normalize_query(query))
+        if existing is not None and not existing.finished:
+            existing.waiters += 1
+            self.coalesced += 1
+            logger.info(f"Attached query to in-flight job {existing.id} ({existing.waiters} waiters)")
+            return existing
+        if self.queue_depth() >= self.max_queue:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+        job = Job(query)
+        self.jobs[job.id] = job
+        self.inflight[job.key] = job
+        self._prune_history()
+        await self.queue.put(job)
+        logger.info(f"Queued job {job.id} for query: {query} (queue depth: {self.queue_depth()})")
+        return job
+
+    async def resume(self, job_id: str) -> Job:
+        """
+        Re-queue a failed, cancelled or interrupted job from its last
+        checkpoint, keeping its ID. Works for jobs from before a restart too,
+        as long as their checkpoints were saved to disk (CHECKPOINT_PATH).
+
+        Raises LookupError if there is nothing to resume from, JobStateError
+        if the job is still queued or running and QueueFullError if the
+        queue is at capacity.
+        """
+        self._ensure_workers()
+        previous = self.jobs.get(job_id)
+        if previous is not None and not previous.finished:
+            raise JobStateError(f"Job {job_id} is still {previous.status}")
+        if previous is not None and previous.status == COMPLETED:
+            raise JobStateError(f"Job {job_id} already completed")
+        from app.core.graph import resume_point
+        point = await asyncio.to_thread(resume_point, job_id)
+        if point is None:
+            raise LookupError(f"No checkpoint to resume job {job_id} from")
+        if self.queue_depth() >= self.max_queue:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+
+        query = point["values"].get("query") or (previous.query if previous else "")
+        job = Job(query, job_id=job_id)
+        job.resume_config = point["config"]
+        job.resume_values = point["values"]
+        job.resumes = (previous.resumes if previous else 0) + 1
+        if previous is not None:
+            job.created_at = previous.created_at
+            job.progress = previous.progress
+        self.jobs[job.id] = job
+        self.inflight.setdefault(job.key, job)
+        await self.queue.put(job)
+        logger.info(f"Resuming job {job.id} before {list(point['next'])} (queue depth: {self.queue_depth()})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def subscribe(self, job: Job) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job's events from the start, then live ones until it finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in job.events:
+            queue.put_nowait(event)
+        if job.finished:
+            queue.put_nowait(_END)
+        job.subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _END:
+                    break
+                yield event
+        finally:
+            job.subscribers.remove(queue)
+
+    def _publish(self, job: Job, event: Dict[str, Any]):
+        job.events.append(event)
+        if "token" not in event:
+            job.progress.append({**event, "timestamp": time.time()})
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job. Returns the job, or None if unknown.
+
+        A job shared by several submissions only loses one waiter and keeps
+        running for the others.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.waiters > 1:
+            job.waiters -= 1
+            logger.info(f"Detached one waiter from job {job_id} ({job.waiters} left)")
+            return job
+        job.cancel_requested = True
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            self._finish(job, CANCELLED)
+        logger.info(f"Cancelled job {job_id}")
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.finished:
+                    continue  # cancelled while queued
+                job.status = RUNNING
+                job.task = asyncio.create_task(self._run(job))
+                try:
+                    # wait() does not raise when the job itself is cancelled
+                    await asyncio.wait({job.task})
+                except asyncio.CancelledError:
+                    job.task.cancel()  # the worker itself is shutting down
+                    raise
+                if not job.finished:
+                    self._finish(job, CANCELLED)  # cancelled before _run got to start
+                from app.core.graph import prune_checkpoints
+                await asyncio.to_thread(prune_checkpoints)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.started_at = time.time()
+        logger.info(f"Starting job {job.id}")
+        final_state: Dict[str, Any] = {}
+        tracker = ProgressTracker()
+        from app.core.graph import run_config, discard_checkpoints
+        if job.resume_config is not None:
+            # Continue from the checkpoint; finished work is not run again
+            graph_input, config = None, job.resume_config
+            tracker.resume_from(job.resume_values)
+        else:
+            graph_input, config = {"query": job.query}, run_config(job.id)
+        try:
+            with job_context(job.id), tracer.trace(job.id, query=job.query):
+                async for mode, chunk in self._get_graph().astream(
+                    graph_input, config, stream_mode=["updates", "custom", "values"]
+                ):
+                    if mode == "values":
+                        final_state = chunk
+                    elif mode == "custom":
+                        # Report tokens emitted by the writer node
+                        self._publish(job, {"step": "writer", "status": "streaming", **chunk})
+                    else:
+                        for node, update in chunk.items():
+                            if node == "__metadata__":
+                                continue  # marks outputs replayed from a checkpoint
+                            self._publish(job, tracker.update(node, update))
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            self._finish(job, FAILED, error=str(e))
+            return
+
+        job.state = final_state
+        job.final_report = final_state.get("final_report")
+        if final_state.get("error"):
+            self._finish(job, FAILED, error=final_state["error"])
+        else:
+            self._finish(job, COMPLETED)
+            # Failed and cancelled jobs keep their checkpoints for resume
+            await asyncio.to_thread(discard_checkpoints, job.id)
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        metrics.JOBS_FINISHED.inc(status=status)
+        if job.started_at:
+            metrics.JOB_DURATION.observe(job.finished_at - job.started_at)
+        if self.inflight.get(job.key) is job:
+            del self.inflight[job.key]
+        for queue in job.subscribers:
+            queue.put_nowait(_END)
+        if job.started_at:
+            logger.info(f"Job {job.id} {status} after {job.finished_at - job.started_at:.1f}s")
+
+    def _prune_history(self):
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - self.history_limit
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.finished_at or 0)[:excess]:
+                del self.jobs[job.id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth(),
+            "active_jobs": self.active_jobs(),
+            "coalesced": self.coalesced,
+            "jobs_by_status": counts,
+        }
+
+
+# Global instance
+job_manager = JobManager()
+metrics.JOB_QUEUE_DEPTH.set_function(job_manager.queue_depth)
+metrics.JOBS_ACTIVE.set_function(job_manager.active_jobs)
@@ -0,0 +1,239 @@
+# File: backend/app/core/metrics.py
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down. ``set_function`` makes the gauge read its
+    value at scrape time instead (for queue depths and other live state).
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.function: Optional[Callable[[], object]] = None
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def set_function(self, function: Callable[[], object]):
+        """``function`` returns a number, or ``{label values tuple: number}`` for labelled gauges."""
+        self.function = function
+
+    def _samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                current = self.function()
+            except Exception:
+                return []
+            values = current if isinstance(current, dict) else {(): current}
+        else:
+            with self.lock:
+                values = dict(self.values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self.lock:
+            # Per bucket counts, then sum, then count
+            series = self.series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the duration of the block, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Research graph ---
+NODE_LATENCY = REGISTRY.register(Histogram(
+    "orchestrateai_node_duration_seconds", "Time spent in each research graph node run.", ["node"]))
+NODE_ERRORS = REGISTRY.register(Counter(
+    "orchestrateai_node_errors_total", "Graph node runs that raised or reported an error.", ["node"]))
+
+# --- LLM providers ---
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "orchestrateai_llm_requests_total", "LLM provider calls by outcome (success, error).", ["provider", "outcome"]))
+LLM_RATE_LIMITED = REGISTRY.register(Counter(
+    "orchestrateai_llm_rate_limited_total", "LLM provider calls rejected with 429 / rate limit errors.", ["provider"]))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "orchestrateai_llm_request_duration_seconds", "Latency of successful LLM provider calls.", ["provider"]))
+LLM_PROMPT_CHARS = REGISTRY.register(Counter(
+    "orchestrateai_llm_prompt_characters_total", "Prompt characters sent to each provider.", ["provider"]))
+LLM_COMPLETION_CHARS = REGISTRY.register(Counter(
+    "orchestrateai_llm_completion_characters_total", "Completion characters received from each provider.", ["provider"]))
+LLM_PROMPT_TOKENS = REGISTRY.register(Counter(
+    "orchestrateai_llm_prompt_tokens_total", "Prompt tokens sent to each provider (estimated without tiktoken).", ["provider"]))
+LLM_COMPLETION_TOKENS = REGISTRY.register(Counter(
+    "orchestrateai_llm_completion_tokens_total", "Completion tokens received from each provider (estimated without tiktoken).", ["provider"]))
+LLM_CACHE_HITS = REGISTRY.register(Counter(
+    "orchestrateai_llm_cache_hits_total", "LLM calls answered from the response cache."))
+
+# --- Exa search ---
+SEARCH_LATENCY = REGISTRY.register(Histogram(
+    "orchestrateai_search_duration_seconds", "Latency of Exa search calls (cache misses only)."))
+SEARCH_ERRORS = REGISTRY.register(Counter(
+    "orchestrateai_search_errors_total", "Exa search calls that failed."))
+SEARCH_CACHE_HITS = REGISTRY.register(Counter(
+    "orchestrateai_search_cache_hits_total", "Searches answered from the search cache."))
+SEARCH_CONTENT_CHARS = REGISTRY.register(Counter(
+    "orchestrateai_search_content_characters_total", "Page content characters downloaded from Exa, by fetch mode.",
+    ["mode"]))
+
+# --- Domain reputation ---
+REPUTATION_DECISIONS = REGISTRY.register(Counter(
+    "orchestrateai_reputation_decisions_total",
+    "Sources whose LLM review was skipped by domain reputation (trusted) or that were dropped (blocked).",
+    ["decision"]))
+
+# --- Jobs ---
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "orchestrateai_job_queue_depth", "Research jobs waiting for a worker."))
+JOBS_ACTIVE = REGISTRY.register(Gauge(
+    "orchestrateai_jobs_active", "Research jobs currently running."))
+JOBS_FINISHED = REGISTRY.register(Counter(
+    "orchestrateai_jobs_finished_total", "Research jobs finished, by final status.", ["status"]))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "orchestrateai_job_duration_seconds", "Research job run time, from start to finish.",
+    buckets=(5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0)))
+
+# --- Governor ---
+GOVERNOR_IN_FLIGHT = REGISTRY.register(Gauge(
+    "orchestrateai_governor_in_flight", "Calls in flight per governed resource.", ["resource"]))
+GOVERNOR_WAITING = REGISTRY.register(Gauge(
+    "orchestrateai_governor_waiting", "Calls waiting for a slot per governed resource.", ["resource"]))
+
+
+def render() -> str:
+    return REGISTRY.render()
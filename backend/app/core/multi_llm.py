@@ -1,14 +1,26 @@
 # File: backend/app/core/multi_llm.py
 import os
 import time
-import random
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+import math
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures, FIRST_COMPLETED
+from typing import Optional, Dict, Any, List, Deque, Iterator, AsyncIterator
 from abc import ABC, abstractmethod
 import openai
 import google.generativeai as genai
-from groq import Groq
+from groq import Groq, AsyncGroq
 from dotenv import load_dotenv
+from app.core.router import ProviderRouter
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.cache import TieredCache, make_cache_key
+from app.core.rate_limiter import ProviderRateLimiter, ProviderPausedError, is_rate_limit_error
+from app.core.governor import governor, AdmissionError, OverloadedError
+from app.core import metrics
+from app.core.tracing import tracer
+from app.core.tokens import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +29,39 @@ load_dotenv()
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    # Prompt + completion tokens the model accepts
+    context_window: int = 8192
+    
+    # Called with the HTTP response headers of each request when the SDK
+    # exposes them, so the client can track the provider's rate-limit quota.
+    on_headers = None
+    
+    def _report_headers(self, headers):
+        if self.on_headers is not None:
+            self.on_headers(headers)
+    
     @abstractmethod
     def generate(self, prompt: str, max_tokens: int = 300) -> str:
         """Generate text from prompt."""
         pass
     
+    async def agenerate(self, prompt: str, max_tokens: int = 300) -> str:
+        """
+        Generate text from prompt without blocking the event loop.
+
+        Providers with a native async client override this; the default runs
+        the synchronous ``generate`` in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate, prompt, max_tokens)
+    
+    def stream(self, prompt: str, max_tokens: int = 300) -> Iterator[str]:
+        """Generate text as a stream of chunks. Defaults to a single chunk."""
+        yield self.generate(prompt, max_tokens)
+    
+    async def astream(self, prompt: str, max_tokens: int = 300) -> AsyncIterator[str]:
+        """Async variant of ``stream``. Defaults to a single chunk."""
+        yield await self.agenerate(prompt, max_tokens)
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if provider is available."""
@@ -31,32 +71,94 @@ class LLMProvider(ABC):
     def get_name(self) -> str:
         """Get provider name."""
         pass
+    
+    def get_model(self) -> str:
+        """Get the model identifier (part of the response cache key)."""
+        return str(getattr(self, "model", ""))
 
 class OpenAIProvider(LLMProvider):
+    context_window = 16385
+    
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.client = None
+        self.async_client = None
         self.model = "gpt-3.5-turbo"
         
         # Only initialize client if API key is available
         if self.api_key:
             try:
                 self.client = openai.OpenAI(api_key=self.api_key)
+                self.async_client = openai.AsyncOpenAI(api_key=self.api_key)
             except Exception as e:
                 logger.warning(f"Failed to initialize OpenAI client: {e}")
                 self.client = None
+                self.async_client = None
     
     def generate(self, prompt: str, max_tokens: int = 300) -> str:
         if not self.client:
             raise Exception("OpenAI client not initialized - no API key available")
         
         try:
-            response = self.client.chat.completions.create(
+            raw = self.client.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens
             )
-            return response.choices[0].message.content
+            self._report_headers(raw.headers)
+            return raw.parse().choices[0].message.content
+        except Exception as e:
+            logger.error(f"OpenAI error: {e}")
+            raise
+    
+    async def agenerate(self, prompt: str, max_tokens: int = 300) -> str:
+        if not self.async_client:
+            raise Exception("OpenAI client not initialized - no API key available")
+        
+        try:
+            raw = await self.async_client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens
+            )
+            self._report_headers(raw.headers)
+            return raw.parse().choices[0].message.content
+        except Exception as e:
+            logger.error(f"OpenAI error: {e}")
+            raise
+    
+    def stream(self, prompt: str, max_tokens: int = 300) -> Iterator[str]:
+        if not self.client:
+            raise Exception("OpenAI client not initialized - no API key available")
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"OpenAI error: {e}")
+            raise
+    
+    async def astream(self, prompt: str, max_tokens: int = 300) -> AsyncIterator[str]:
+        if not self.async_client:
+            raise Exception("OpenAI client not initialized - no API key available")
+        
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
             logger.error(f"OpenAI error: {e}")
             raise
@@ -68,30 +170,88 @@ class OpenAIProvider(LLMProvider):
         return "OpenAI"
 
 class GroqProvider(LLMProvider):
+    context_window = 8192
+    
     def __init__(self):
         self.api_key = os.getenv("GROQ_API_KEY")
         self.client = None
+        self.async_client = None
         self.model = "llama3-8b-8192"  # Fast model
         
         # Only initialize client if API key is available
         if self.api_key:
             try:
                 self.client = Groq(api_key=self.api_key)
+                self.async_client = AsyncGroq(api_key=self.api_key)
             except Exception as e:
                 logger.warning(f"Failed to initialize Groq client: {e}")
                 self.client = None
+                self.async_client = None
     
     def generate(self, prompt: str, max_tokens: int = 300) -> str:
         if not self.client:
             raise Exception("Groq client not initialized - no API key available")
         
         try:
-            response = self.client.chat.completions.create(
+            raw = self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens
+            )
+            self._report_headers(raw.headers)
+            return raw.parse().choices[0].message.content
+        except Exception as e:
+            logger.error(f"Groq error: {e}")
+            raise
+    
+    async def agenerate(self, prompt: str, max_tokens: int = 300) -> str:
+        if not self.async_client:
+            raise Exception("Groq client not initialized - no API key available")
+        
+        try:
+            raw = await self.async_client.chat.completions.with_raw_response.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens
             )
-            return response.choices[0].message.content
+            self._report_headers(raw.headers)
+            return raw.parse().choices[0].message.content
+        except Exception as e:
+            logger.error(f"Groq error: {e}")
+            raise
+    
+    def stream(self, prompt: str, max_tokens: int = 300) -> Iterator[str]:
+        if not self.client:
+            raise Exception("Groq client not initialized - no API key available")
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"Groq error: {e}")
+            raise
+    
+    async def astream(self, prompt: str, max_tokens: int = 300) -> AsyncIterator[str]:
+        if not self.async_client:
+            raise Exception("Groq client not initialized - no API key available")
+        
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         except Exception as e:
             logger.error(f"Groq error: {e}")
             raise
@@ -103,15 +263,18 @@ class GroqProvider(LLMProvider):
         return "Groq"
 
 class GeminiProvider(LLMProvider):
+    context_window = 1048576
+    
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.model = None
+        self.model_name = "gemini-1.5-flash"
         
         # Only initialize client if API key is available
         if self.api_key:
             try:
                 genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                self.model = genai.GenerativeModel(self.model_name)
             except Exception as e:
                 logger.warning(f"Failed to initialize Gemini client: {e}")
                 self.model = None
@@ -127,11 +290,50 @@ class GeminiProvider(LLMProvider):
             logger.error(f"Gemini error: {e}")
             raise
     
+    async def agenerate(self, prompt: str, max_tokens: int = 300) -> str:
+        if not self.model:
+            raise Exception("Gemini client not initialized - no API key available")
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            return response.text
+        except Exception as e:
+            logger.error(f"Gemini error: {e}")
+            raise
+    
+    def stream(self, prompt: str, max_tokens: int = 300) -> Iterator[str]:
+        if not self.model:
+            raise Exception("Gemini client not initialized - no API key available")
+        
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Gemini error: {e}")
+            raise
+    
+    async def astream(self, prompt: str, max_tokens: int = 300) -> AsyncIterator[str]:
+        if not self.model:
+            raise Exception("Gemini client not initialized - no API key available")
+        
+        try:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Gemini error: {e}")
+            raise
+    
     def is_available(self) -> bool:
         return bool(self.api_key and self.model)
     
     def get_name(self) -> str:
         return "Gemini"
+    
+    def get_model(self) -> str:
+        return self.model_name
 
 class MultiLLMClient:
     """Multi-provider LLM client with automatic fallback."""
@@ -140,12 +342,26 @@ class MultiLLMClient:
         self.providers: List[LLMProvider] = []
         self.provider_stats: Dict[str, Dict[str, Any]] = {}
         
+        # Hedged requests: if the current provider has not answered within this
+        # percentile of its recent latencies, race the next provider against it.
+        self.hedging_enabled = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "5"))
+        
         # Initialize available providers
         self._init_providers()
+        self.set_providers(self.providers)
         
-        # Rate limiting per provider
-        self.last_request_time: Dict[str, float] = {}
-        self.min_request_interval = 0.5  # Minimum seconds between requests per provider
+        # Content-addressed response cache; hits skip pacing and the provider.
+        # Set LLM_CACHE_PATH to add an on-disk tier that survives restarts.
+        self.cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.cache = TieredCache(
+            "llm",
+            ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            disk_path=os.getenv("LLM_CACHE_PATH") or None,
+            max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+        )
     
     def _init_providers(self):
         """Initialize available providers in order of preference."""
@@ -160,12 +376,6 @@ class MultiLLMClient:
             try:
                 if provider.is_available():
                     self.providers.append(provider)
-                    self.provider_stats[provider.get_name()] = {
-                        "success_count": 0,
-                        "error_count": 0,
-                        "last_error": None,
-                        "last_success": None
-                    }
                     logger.info(f"✅ Initialized {provider.get_name()} provider")
                 else:
                     logger.warning(f"❌ {provider.get_name()} provider not available - missing or invalid API key")
@@ -187,91 +397,573 @@ class MultiLLMClient:
         
         logger.info(f"🚀 Available providers: {[p.get_name() for p in self.providers]}")
     
-    def _rate_limit_provider(self, provider_name: str):
-        """Ensure minimum interval between requests to same provider."""
-        now = time.time()
-        last_time = self.last_request_time.get(provider_name, 0)
+    @staticmethod
+    def _new_provider_stats() -> Dict[str, Any]:
+        return {
+            "success_count": 0,
+            "error_count": 0,
+            "last_error": None,
+            "last_success": None,
+            "hedge_count": 0,      # hedged requests sent to this provider
+            "hedge_wins": 0,       # hedged requests that answered first
+            "cancelled_count": 0,  # async requests cancelled after losing a race
+            "abandoned_count": 0   # sync requests left to finish after losing a race
+        }
+    
+    def set_providers(self, providers: List[LLMProvider]):
+        """
+        Use ``providers`` (in order of preference) and reset all per-provider
+        state. Also how benchmark.py plugs in simulated providers.
+        """
+        self.providers = list(providers)
+        self.provider_stats = {p.get_name(): self._new_provider_stats() for p in self.providers}
+        
+        # Request/token budgets per provider, kept in step with the
+        # providers' rate-limit headers
+        self.limiters: Dict[str, ProviderRateLimiter] = {}
+        for provider in self.providers:
+            provider.on_headers = self._limiter(provider.get_name()).update_from_headers
+        
+        self.latency_history: Dict[str, Deque[float]] = {
+            p.get_name(): deque(maxlen=100) for p in self.providers
+        }
         
-        if now - last_time < self.min_request_interval:
-            sleep_time = self.min_request_interval - (now - last_time)
-            time.sleep(sleep_time)
+        # Health-aware provider ordering (see app/core/router.py)
+        self.router = ProviderRouter([p.get_name() for p in self.providers])
+        
+        # One circuit breaker per provider: dead providers are skipped for free
+        self.breakers: Dict[str, CircuitBreaker] = {
+            p.get_name(): CircuitBreaker(p.get_name()) for p in self.providers
+        }
+    
+    def _limiter(self, provider_name: str) -> ProviderRateLimiter:
+        if provider_name not in self.limiters:
+            self.limiters[provider_name] = ProviderRateLimiter(provider_name)
+        return self.limiters[provider_name]
+    
+    @staticmethod
+    def _estimate_tokens(prompt: str, max_tokens: int) -> int:
+        """Tokens to reserve for a request: the prompt plus the full completion budget."""
+        return count_tokens(prompt) + max_tokens
+    
+    def _record_usage(self, provider_name: str, prompt: str, max_tokens: int, result: str):
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(result or "")
+        self._limiter(provider_name).record_usage(self._estimate_tokens(prompt, max_tokens), prompt_tokens + completion_tokens)
+        metrics.LLM_PROMPT_CHARS.inc(len(prompt), provider=provider_name)
+        metrics.LLM_COMPLETION_CHARS.inc(len(result or ""), provider=provider_name)
+        metrics.LLM_PROMPT_TOKENS.inc(prompt_tokens, provider=provider_name)
+        metrics.LLM_COMPLETION_TOKENS.inc(completion_tokens, provider=provider_name)
+    
+    def _breaker(self, provider_name: str) -> CircuitBreaker:
+        if provider_name not in self.breakers:
+            self.breakers[provider_name] = CircuitBreaker(provider_name)
+        return self.breakers[provider_name]
+    
+    def _record_success(self, provider_name: str, start_time: float, result: str = ""):
+        self._breaker(provider_name).record_success()
+        self.provider_stats[provider_name]["success_count"] += 1
+        self.provider_stats[provider_name]["last_success"] = time.time()
         
-        self.last_request_time[provider_name] = time.time()
+        elapsed = time.time() - start_time
+        self.latency_history.setdefault(provider_name, deque(maxlen=100)).append(elapsed)
+        self.router.record_success(provider_name, elapsed, len(result or "") // 4)
+        metrics.LLM_REQUESTS.inc(provider=provider_name, outcome="success")
+        metrics.LLM_LATENCY.observe(elapsed, provider=provider_name)
+        logger.info(f"✅ {provider_name} succeeded in {elapsed:.2f}s")
     
-    def generate_with_fallback(self, prompt: str, max_tokens: int = 300) -> str:
-        """Generate text using available providers with automatic fallback."""
+    def _record_failure(self, provider_name: str, error: Exception):
+        self._breaker(provider_name).record_failure()
+        self.provider_stats[provider_name]["error_count"] += 1
+        self.provider_stats[provider_name]["last_error"] = str(error)
+        self.router.record_failure(provider_name)
+        metrics.LLM_REQUESTS.inc(provider=provider_name, outcome="error")
+        if is_rate_limit_error(error):
+            metrics.LLM_RATE_LIMITED.inc(provider=provider_name)
+            # Pause this provider (for its Retry-After when given); the
+            # fallback loop moves straight on to the next one.
+            self._limiter(provider_name).on_rate_limit(error)
+        
+        logger.warning(f"❌ {provider_name} failed: {error}")
+    
+    def _ordered_providers(self, strategy: Optional[str] = None) -> List[LLMProvider]:
+        """Providers for this call, best first according to the routing strategy."""
+        by_name = {p.get_name(): p for p in self.providers}
+        return [by_name[name] for name in self.router.order(list(by_name), strategy)]
+    
+    # --- Response cache ---
+    
+    def _cache_key(self, provider: LLMProvider, prompt: str, max_tokens: int) -> str:
+        # Generation params beyond max_tokens are provider defaults today; they
+        # belong in the last slot once callers can set them.
+        return make_cache_key("llm", provider.get_name(), provider.get_model(), prompt, max_tokens, {})
+    
+    def _cached_response(self, providers: List[LLMProvider], prompt: str, max_tokens: int,
+                         use_cache: Optional[bool]) -> Optional[str]:
+        """
+        Return a cached answer from any candidate provider, best-ranked first.
+        All candidates are looked up together, as one cache hit or miss.
+        """
+        if not (self.cache_enabled if use_cache is None else use_cache):
+            return None
+        keys = {self._cache_key(provider, prompt, max_tokens): provider for provider in providers}
+        hit = self.cache.get_first(list(keys))
+        if hit is None:
+            return None
+        key, cached = hit
+        logger.info(f"💾 Cache hit for {keys[key].get_name()} response")
+        metrics.LLM_CACHE_HITS.inc()
+        return cached
+    
+    def _store_response(self, provider: LLMProvider, prompt: str, max_tokens: int, result: str):
+        if self.cache_enabled and result:
+            self.cache.set(self._cache_key(provider, prompt, max_tokens), result)
+    
+    @staticmethod
+    def _span_attributes(provider: LLMProvider, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "provider": provider.get_name(),
+            "model": provider.get_model(),
+            "prompt_chars": len(prompt),
+            "max_tokens": max_tokens,
+        }
+    
+    def _check_circuit(self, provider_name: str):
+        if not self._breaker(provider_name).allow_request():
+            logger.info(f"⏭️ Skipping {provider_name}: circuit open")
+            raise CircuitOpenError(f"{provider_name} circuit open")
+    
+    def _check_paused(self, provider_name: str):
+        paused_for = self._limiter(provider_name).paused_for()
+        if paused_for > 0:
+            logger.info(f"⏭️ Skipping {provider_name}: rate limited for another {paused_for:.1f}s")
+            raise ProviderPausedError(f"{provider_name} rate limited for another {paused_for:.1f}s")
+    
+    def _call_provider(self, provider: LLMProvider, prompt: str, max_tokens: int, skip_paused: bool = True) -> str:
+        """
+        One attempt on ``provider``. A provider paused after a 429 is skipped
+        (ProviderPausedError) unless ``skip_paused`` is False, as for the last
+        candidate of a request, which waits the pause out instead.
+        """
+        provider_name = provider.get_name()
+        if skip_paused:
+            self._check_paused(provider_name)
+        # Admission (AdmissionError) comes first so a call stuck in the
+        # governor's queue does not hold the circuit's half-open probe.
+        requested_at = time.time()
+        with tracer.span("llm.generate", kind="llm", **self._span_attributes(provider, prompt, max_tokens)) as span:
+            with governor.slot(provider_name):
+                self._check_circuit(provider_name)
+                if skip_paused:
+                    # The pause may have started while this call was queued
+                    self._check_paused(provider_name)
+                self._limiter(provider_name).acquire(self._estimate_tokens(prompt, max_tokens))
+                logger.info(f"Trying {provider_name} for generation...")
+                start_time = time.time()
+                # Time spent waiting for admission and rate-limit budget
+                span.set(wait=round(start_time - requested_at, 4))
+                try:
+                    result = provider.generate(prompt, max_tokens)
+                except Exception as e:
+                    self._record_failure(provider_name, e)
+                    raise
+            span.set(completion_chars=len(result or ""))
+        self._record_success(provider_name, start_time, result)
+        self._record_usage(provider_name, prompt, max_tokens, result)
+        self._store_response(provider, prompt, max_tokens, result)
+        return result
+    
+    async def _acall_provider(self, provider: LLMProvider, prompt: str, max_tokens: int, skip_paused: bool = True) -> str:
+        """Async variant of ``_call_provider``."""
+        provider_name = provider.get_name()
+        if skip_paused:
+            self._check_paused(provider_name)
+        requested_at = time.time()
+        with tracer.span("llm.generate", kind="llm", **self._span_attributes(provider, prompt, max_tokens)) as span:
+            async with governor.aslot(provider_name):
+                self._check_circuit(provider_name)
+                if skip_paused:
+                    self._check_paused(provider_name)
+                try:
+                    await self._limiter(provider_name).aacquire(self._estimate_tokens(prompt, max_tokens))
+                    logger.info(f"Trying {provider_name} for generation...")
+                    start_time = time.time()
+                    # Time spent waiting for admission and rate-limit budget
+                    span.set(wait=round(start_time - requested_at, 4))
+                    result = await provider.agenerate(prompt, max_tokens)
+                except asyncio.CancelledError:
+                    # A cancelled hedge must not hold the half-open probe slot
+                    self._breaker(provider_name).record_cancelled()
+                    raise
+                except Exception as e:
+                    self._record_failure(provider_name, e)
+                    raise
+            span.set(completion_chars=len(result or ""))
+        self._record_success(provider_name, start_time, result)
+        self._record_usage(provider_name, prompt, max_tokens, result)
+        self._store_response(provider, prompt, max_tokens, result)
+        return result
+    
+    def _all_failed_error(self, errors: Dict[str, Exception]) -> Exception:
+        """
+        The error for a request no provider answered, naming why each provider
+        failed or was skipped. When admission control turned every provider
+        away the request was shed rather than failed: that is an
+        ``OverloadedError``.
+        """
+        # Governor and circuit errors already start with the provider name
+        reasons = "; ".join(
+            str(error) if str(error).startswith(name) else f"{name}: {error}" for name, error in errors.items()
+        ) or "no provider was tried"
+        if errors and all(isinstance(error, AdmissionError) for error in errors.values()):
+            error = OverloadedError(f"All providers overloaded: {reasons}")
+        else:
+            error = Exception(f"All providers failed: {reasons}")
+        logger.error(str(error))
+        return error
+    
+    def generate_with_fallback(self, prompt: str, max_tokens: int = 300, hedge: Optional[bool] = None,
+                               strategy: Optional[str] = None, use_cache: Optional[bool] = None) -> str:
+        """
+        Generate text using available providers with automatic fallback.
+
+        ``hedge`` overrides the client-wide ``LLM_HEDGING_ENABLED`` setting for
+        this call; ``strategy`` overrides the routing strategy used to order
+        the providers (see ``app.core.router``); ``use_cache=False`` skips the
+        response cache lookup.
+        """
         
         # Log context size for monitoring
         context_size = len(prompt)
         logger.info(f"MultiLLM context size: {context_size} characters (~{context_size//4} tokens)")
         
+        providers = self._ordered_providers(strategy)
+        
+        cached = self._cached_response(providers, prompt, max_tokens, use_cache)
+        if cached is not None:
+            return cached
+        
+        if self._should_hedge(hedge):
+            return self._generate_hedged(prompt, max_tokens, providers)
+        
         # Try each provider in order
-        for provider in self.providers:
-            provider_name = provider.get_name()
-            
+        errors: Dict[str, Exception] = {}
+        for i, provider in enumerate(providers):
             try:
-                # Rate limit this provider
-                self._rate_limit_provider(provider_name)
-                
-                logger.info(f"Trying {provider_name} for generation...")
-                start_time = time.time()
-                
-                result = provider.generate(prompt, max_tokens)
-                
-                # Update stats
-                self.provider_stats[provider_name]["success_count"] += 1
-                self.provider_stats[provider_name]["last_success"] = time.time()
-                
-                elapsed = time.time() - start_time
-                logger.info(f"✅ {provider_name} succeeded in {elapsed:.2f}s")
-                
-                return result
-                
+                return self._call_provider(provider, prompt, max_tokens, skip_paused=i < len(providers) - 1)
             except Exception as e:
-                # Update error stats
-                self.provider_stats[provider_name]["error_count"] += 1
-                self.provider_stats[provider_name]["last_error"] = str(e)
-                
-                logger.warning(f"❌ {provider_name} failed: {e}")
-                
-                # If it's a rate limit, add extra delay
-                if "429" in str(e) or "rate limit" in str(e).lower():
-                    delay = random.uniform(2, 5)
-                    logger.info(f"Rate limit hit on {provider_name}, waiting {delay:.1f}s")
-                    time.sleep(delay)
+                errors[provider.get_name()] = e
+        
+        # If all providers failed
+        raise self._all_failed_error(errors)
+    
+    async def agenerate_with_fallback(self, prompt: str, max_tokens: int = 300, hedge: Optional[bool] = None,
+                                      strategy: Optional[str] = None, use_cache: Optional[bool] = None) -> str:
+        """
+        Async variant of ``generate_with_fallback``.
+
+        Uses the providers' async clients and ``asyncio.sleep`` for pacing and
+        back-off, so many jobs can share one event loop.
+        """
+        context_size = len(prompt)
+        logger.info(f"MultiLLM context size: {context_size} characters (~{context_size//4} tokens)")
+        
+        providers = self._ordered_providers(strategy)
+        
+        cached = self._cached_response(providers, prompt, max_tokens, use_cache)
+        if cached is not None:
+            return cached
+        
+        if self._should_hedge(hedge):
+            return await self._agenerate_hedged(prompt, max_tokens, providers)
+        
+        errors: Dict[str, Exception] = {}
+        for i, provider in enumerate(providers):
+            try:
+                return await self._acall_provider(provider, prompt, max_tokens, skip_paused=i < len(providers) - 1)
+            except Exception as e:
+                errors[provider.get_name()] = e
+        
+        raise self._all_failed_error(errors)
+    
+    # --- Streaming ---
+    
+    def stream_with_fallback(self, prompt: str, max_tokens: int = 300, strategy: Optional[str] = None,
+                             use_cache: Optional[bool] = None) -> Iterator[str]:
+        """
+        Stream generated text chunk by chunk.
+
+        Falls back to the next provider only while nothing has been emitted;
+        once text has been yielded a failure is raised to the caller, since
+        the partial output cannot be taken back. Cache hits arrive as a single
+        chunk.
+        """
+        context_size = len(prompt)
+        logger.info(f"MultiLLM streaming context size: {context_size} characters (~{context_size//4} tokens)")
+        
+        providers = self._ordered_providers(strategy)
+        cached = self._cached_response(providers, prompt, max_tokens, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        errors: Dict[str, Exception] = {}
+        for i, provider in enumerate(providers):
+            provider_name = provider.get_name()
+            try:
+                if i < len(providers) - 1:
+                    self._check_paused(provider_name)
+                job_id = governor.acquire(provider_name)
+            except (AdmissionError, ProviderPausedError) as e:
+                logger.warning(f"⏭️ Skipping {provider_name}: {e}")
+                errors[provider_name] = e
+                continue
+            try:
+                try:
+                    self._check_circuit(provider_name)
+                except CircuitOpenError as e:
+                    errors[provider_name] = e
+                    continue
                 
+                chunks: List[str] = []
+                with tracer.span("llm.stream", kind="llm", **self._span_attributes(provider, prompt, max_tokens)) as span:
+                    try:
+                        self._limiter(provider_name).acquire(self._estimate_tokens(prompt, max_tokens))
+                        logger.info(f"Streaming from {provider_name}...")
+                        start_time = time.time()
+                        for chunk in provider.stream(prompt, max_tokens):
+                            chunks.append(chunk)
+                            yield chunk
+                    except GeneratorExit:
+                        self._breaker(provider_name).record_cancelled()
+                        raise
+                    except Exception as e:
+                        self._record_failure(provider_name, e)
+                        span.set(error=str(e))
+                        if chunks:
+                            raise
+                        errors[provider_name] = e
+                        continue
+                    span.set(completion_chars=sum(len(c) for c in chunks))
+            finally:
+                governor.release(provider_name, job_id)
+            
+            result = "".join(chunks)
+            self._record_success(provider_name, start_time, result)
+            self._record_usage(provider_name, prompt, max_tokens, result)
+            self._store_response(provider, prompt, max_tokens, result)
+            return
+        
+        raise self._all_failed_error(errors)
+    
+    async def astream_with_fallback(self, prompt: str, max_tokens: int = 300, strategy: Optional[str] = None,
+                                    use_cache: Optional[bool] = None) -> AsyncIterator[str]:
+        """Async variant of ``stream_with_fallback``."""
+        context_size = len(prompt)
+        logger.info(f"MultiLLM streaming context size: {context_size} characters (~{context_size//4} tokens)")
+        
+        providers = self._ordered_providers(strategy)
+        cached = self._cached_response(providers, prompt, max_tokens, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        errors: Dict[str, Exception] = {}
+        for i, provider in enumerate(providers):
+            provider_name = provider.get_name()
+            try:
+                if i < len(providers) - 1:
+                    self._check_paused(provider_name)
+                job_id = await governor.aacquire(provider_name)
+            except (AdmissionError, ProviderPausedError) as e:
+                logger.warning(f"⏭️ Skipping {provider_name}: {e}")
+                errors[provider_name] = e
                 continue
+            try:
+                try:
+                    self._check_circuit(provider_name)
+                except CircuitOpenError as e:
+                    errors[provider_name] = e
+                    continue
+                
+                chunks: List[str] = []
+                with tracer.span("llm.stream", kind="llm", **self._span_attributes(provider, prompt, max_tokens)) as span:
+                    try:
+                        await self._limiter(provider_name).aacquire(self._estimate_tokens(prompt, max_tokens))
+                        logger.info(f"Streaming from {provider_name}...")
+                        start_time = time.time()
+                        async for chunk in provider.astream(prompt, max_tokens):
+                            chunks.append(chunk)
+                            yield chunk
+                    except (asyncio.CancelledError, GeneratorExit):
+                        self._breaker(provider_name).record_cancelled()
+                        raise
+                    except Exception as e:
+                        self._record_failure(provider_name, e)
+                        span.set(error=str(e))
+                        if chunks:
+                            raise
+                        errors[provider_name] = e
+                        continue
+                    span.set(completion_chars=sum(len(c) for c in chunks))
+            finally:
+                governor.release(provider_name, job_id)
+            
+            result = "".join(chunks)
+            self._record_success(provider_name, start_time, result)
+            self._record_usage(provider_name, prompt, max_tokens, result)
+            self._store_response(provider, prompt, max_tokens, result)
+            return
         
-        # If all providers failed
-        error_msg = f"All providers failed. Last errors: {[stats['last_error'] for stats in self.provider_stats.values()]}"
-        logger.error(error_msg)
-        raise Exception(error_msg)
+        raise self._all_failed_error(errors)
+    
+    # --- Hedged requests ---
+    
+    def _should_hedge(self, hedge: Optional[bool]) -> bool:
+        enabled = self.hedging_enabled if hedge is None else hedge
+        return enabled and len(self.providers) > 1
+    
+    def _hedge_delay(self, provider_name: str) -> Optional[float]:
+        """
+        Seconds to wait on a provider before hedging to the next one.
+
+        Returns None until enough latency samples exist, in which case the
+        caller simply waits for the provider to answer or fail.
+        """
+        samples = sorted(self.latency_history.get(provider_name, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        rank = max(0, math.ceil(self.hedge_percentile / 100 * len(samples)) - 1)
+        return samples[min(rank, len(samples) - 1)]
+    
+    def _record_hedge(self, provider_name: str):
+        self.provider_stats[provider_name]["hedge_count"] += 1
+        logger.info(f"⏱️ Hedging request to {provider_name}")
+    
+    def _generate_hedged(self, prompt: str, max_tokens: int, providers: List[LLMProvider]) -> str:
+        """
+        Race providers in fallback order.
+
+        The next provider is started when the newest attempt exceeds its hedge
+        delay or when every running attempt has failed. The first success wins;
+        threads cannot be interrupted, so losing attempts finish in the
+        background and their results are discarded.
+        """
+        errors: Dict[str, Exception] = {}
+        running: Dict[Any, tuple] = {}
+        next_index = 0
+        executor = ThreadPoolExecutor(max_workers=len(providers), thread_name_prefix="orchestrateai-hedge")
+        
+        def launch(hedged: bool):
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            if hedged:
+                self._record_hedge(provider.get_name())
+            future = executor.submit(contextvars.copy_context().run, self._call_provider, provider, prompt, max_tokens,
+                                     next_index < len(providers))
+            running[future] = (provider.get_name(), hedged)
+        
+        try:
+            launch(hedged=False)
+            while running:
+                newest_name = list(running.values())[-1][0]
+                timeout = self._hedge_delay(newest_name) if next_index < len(providers) else None
+                done, _ = wait_futures(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch(hedged=True)
+                    continue
+                for future in done:
+                    provider_name, hedged = running.pop(future)
+                    if future.exception() is not None:
+                        errors[provider_name] = future.exception()
+                        continue
+                    if hedged:
+                        self.provider_stats[provider_name]["hedge_wins"] += 1
+                    return future.result()
+                if not running and next_index < len(providers):
+                    launch(hedged=False)
+        finally:
+            # Losers keep running and record their own outcome; they are
+            # abandoned, not cancelled
+            for provider_name, _ in running.values():
+                self.provider_stats[provider_name]["abandoned_count"] += 1
+            executor.shutdown(wait=False)
+        
+        raise self._all_failed_error(errors)
+    
+    async def _agenerate_hedged(self, prompt: str, max_tokens: int, providers: List[LLMProvider]) -> str:
+        """Async variant of ``_generate_hedged``; losing requests are cancelled."""
+        errors: Dict[str, Exception] = {}
+        running: Dict[asyncio.Task, tuple] = {}
+        next_index = 0
+        
+        def launch(hedged: bool):
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            if hedged:
+                self._record_hedge(provider.get_name())
+            task = asyncio.create_task(self._acall_provider(provider, prompt, max_tokens, next_index < len(providers)))
+            running[task] = (provider.get_name(), hedged)
+        
+        try:
+            launch(hedged=False)
+            while running:
+                newest_name = list(running.values())[-1][0]
+                timeout = self._hedge_delay(newest_name) if next_index < len(providers) else None
+                done, _ = await asyncio.wait(list(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(hedged=True)
+                    continue
+                for task in done:
+                    provider_name, hedged = running.pop(task)
+                    if task.exception() is not None:
+                        errors[provider_name] = task.exception()
+                        continue
+                    if hedged:
+                        self.provider_stats[provider_name]["hedge_wins"] += 1
+                    return task.result()
+                if not running and next_index < len(providers):
+                    launch(hedged=False)
+        finally:
+            for task, (provider_name, _) in running.items():
+                task.cancel()
+                self.provider_stats[provider_name]["cancelled_count"] += 1
+        
+        raise self._all_failed_error(errors)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get provider statistics."""
         return {
             "providers": self.provider_stats,
             "total_providers": len(self.providers),
-            "available_providers": [p.get_name() for p in self.providers]
+            "available_providers": [p.get_name() for p in self.providers],
+            "hedging": {
+                "enabled": self.hedging_enabled,
+                "percentile": self.hedge_percentile,
+                "hedges_sent": sum(s.get("hedge_count", 0) for s in self.provider_stats.values()),
+                "hedge_wins": sum(s.get("hedge_wins", 0) for s in self.provider_stats.values())
+            },
+            "routing": self.router.get_stats(),
+            "circuit_breakers": {name: breaker.get_stats() for name, breaker in self.breakers.items()},
+            "rate_limits": {name: limiter.get_stats() for name, limiter in self.limiters.items()},
+            "governor": governor.get_stats(),
+            "cache": self.cache.get_stats()
         }
     
+    def context_window(self) -> int:
+        """
+        Smallest context window among the available providers, so a prompt
+        sized against it still fits whichever provider the fallback lands on.
+        """
+        return min((p.context_window for p in self.providers), default=LLMProvider.context_window)
+    
     def get_best_provider(self) -> Optional[str]:
-        """Get the provider with the best success rate."""
+        """Get the provider with the lowest recent error rate (latency breaks ties)."""
         if not self.provider_stats:
             return None
         
-        best_provider = None
-        best_ratio = -1
-        
-        for name, stats in self.provider_stats.items():
-            total_requests = stats["success_count"] + stats["error_count"]
-            if total_requests > 0:
-                success_ratio = stats["success_count"] / total_requests
-                if success_ratio > best_ratio:
-                    best_ratio = success_ratio
-                    best_provider = name
-        
-        return best_provider
+        return self.router.best()
 
 # Global instance
 multi_llm_client = MultiLLMClient() 
\ No newline at end of file
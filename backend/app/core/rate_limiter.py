@@ -1,125 +1,213 @@
 # File: backend/app/core/rate_limiter.py
+import os
+import re
 import time
 import random
 import threading
-from typing import Optional
+from typing import Any, Dict, Mapping, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-class AdaptiveRateLimiter:
+class TokenBucket:
     """
-    Adaptive rate limiter that learns from rate limit responses
-    and adjusts delays accordingly to minimize wait times.
+    Thread-safe token bucket refilled at ``rate_per_minute``.
+
+    ``reserve`` never blocks: it takes the tokens immediately (the balance may
+    go negative) and returns how long the caller must wait for them, so the
+    wait happens outside the lock and concurrent callers queue up in order.
+    A rate of 0 disables the bucket.
     """
     
-    def __init__(self, initial_rps: float = 3.0, min_delay: float = 0.5, max_delay: float = 10.0):
-        self.rps = initial_rps  # requests per second
-        self.min_delay = min_delay
-        self.max_delay = max_delay
-        self.current_delay = 1.0 / self.rps
-        self.last_request_time = 0
-        self.rate_limit_count = 0
-        self.success_count = 0
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
         self.lock = threading.Lock()
-        
-        # Adaptive parameters
-        self.backoff_multiplier = 1.5
-        self.recovery_multiplier = 0.9
-        self.stability_threshold = 10  # consecutive successes before reducing delay
-        
-    def wait_if_needed(self):
-        """Wait if necessary to respect rate limits."""
+    
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def reserve(self, amount: float = 1.0) -> float:
+        if not self.enabled:
+            return 0.0
         with self.lock:
-            now = time.time()
-            time_since_last = now - self.last_request_time
-            
-            if time_since_last < self.current_delay:
-                sleep_time = self.current_delay - time_since_last
-                time.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-    
-    def on_rate_limit(self):
-        """Called when a rate limit is hit - increase delay."""
+            now = time.monotonic()
+            self._refill(now)
+            # A request larger than the whole bucket would never fit; let it
+            # through once the bucket is full instead.
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+    
+    def refund(self, amount: float):
+        """Return over-estimated tokens to the bucket."""
+        if not self.enabled or amount <= 0:
+            return
         with self.lock:
-            self.rate_limit_count += 1
-            self.success_count = 0  # Reset success count
-            
-            # Increase delay with backoff
-            self.current_delay = min(
-                self.current_delay * self.backoff_multiplier,
-                self.max_delay
-            )
-            
-            logger.info(f"Rate limit hit. New delay: {self.current_delay:.2f}s")
-    
-    def on_success(self):
-        """Called when a request succeeds - potentially reduce delay."""
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+    
+    def sync(self, remaining: Optional[float], reset_seconds: Optional[float] = None):
+        """Align the balance with the remaining quota a provider reported."""
+        if not self.enabled or remaining is None:
+            return
         with self.lock:
-            self.success_count += 1
-            self.rate_limit_count = max(0, self.rate_limit_count - 1)
-            
-            # If we've had many consecutive successes and no recent rate limits,
-            # gradually reduce the delay
-            if (self.success_count >= self.stability_threshold and 
-                self.rate_limit_count == 0 and 
-                self.current_delay > self.min_delay):
-                
-                self.current_delay = max(
-                    self.current_delay * self.recovery_multiplier,
-                    self.min_delay
-                )
-                self.success_count = 0  # Reset for next cycle
-                
-                logger.info(f"Stable performance. Reduced delay to: {self.current_delay:.2f}s")
-    
-    def get_stats(self):
-        """Get current rate limiter statistics."""
+            now = time.monotonic()
+            self._refill(now)
+            if remaining <= 0 and reset_seconds:
+                # Nothing left until the provider's window resets
+                self.tokens = min(self.tokens, -reset_seconds * self.rate)
+            else:
+                self.tokens = min(self.tokens, remaining)
+    
+    def get_stats(self) -> Dict[str, float]:
         with self.lock:
+            self._refill(time.monotonic())
             return {
-                "current_delay": self.current_delay,
-                "rate_limit_count": self.rate_limit_count,
-                "success_count": self.success_count,
-                "effective_rps": 1.0 / self.current_delay
+                "rate_per_minute": round(self.rate * 60, 2),
+                "capacity": round(self.capacity, 2),
+                "available": round(self.tokens, 2),
             }
 
-# Global rate limiter instance
-rate_limiter = AdaptiveRateLimiter()
 
-def retry_with_adaptive_backoff(func, max_retries=3, base_delay=1.0):
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def parse_duration(value: Any) -> Optional[float]:
     """
-    Enhanced retry function with adaptive backoff based on rate limiter state.
+    Parse a rate-limit reset value into seconds. Accepts plain seconds
+    ("1.5") and Go-style durations as sent by OpenAI and Groq ("6m0s", "20ms").
     """
-    for attempt in range(max_retries):
-        try:
-            # Wait for rate limiter before making request
-            rate_limiter.wait_if_needed()
-            
-            result = func()
-            
-            # Mark success
-            rate_limiter.on_success()
-            
-            return result
-            
-        except Exception as e:
-            if "429" in str(e):
-                # Mark rate limit hit
-                rate_limiter.on_rate_limit()
-                
-                # Calculate adaptive delay
-                delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                logger.warning(f"Rate limit hit, waiting {delay:.1f} seconds... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(delay)
-                
-                if attempt == max_retries - 1:
-                    raise Exception(f"Max retries ({max_retries}) exceeded due to rate limiting")
-            else:
-                # For non-rate-limit errors, still wait a bit but don't adjust rate limiter
-                delay = base_delay * (2 ** attempt)
-                logger.warning(f"Request failed, waiting {delay:.1f} seconds... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(delay)
-                
-                if attempt == max_retries - 1:
-                    raise e 
\ No newline at end of file
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(text)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def headers_from_error(error: Exception) -> Optional[Mapping[str, str]]:
+    """Response headers carried by an SDK error (OpenAI, Groq), if any."""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+
+class ProviderPausedError(Exception):
+    """The provider is paused after a 429; the call should go to another provider."""
+
+
+class ProviderRateLimiter:
+    """
+    Request and token budgets for one LLM provider.
+
+    Two token buckets, in requests per minute and LLM tokens per minute, are
+    configured with ``<PROVIDER>_RPM`` / ``<PROVIDER>_TPM`` (falling back to
+    ``LLM_DEFAULT_RPM`` / ``LLM_DEFAULT_TPM``; 0 disables a bucket). Both are
+    kept in step with the provider's ``x-ratelimit-*`` headers, and a
+    ``Retry-After`` on a 429 pauses the provider for that long.
+    """
+    
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        self.name = name
+        prefix = name.upper()
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv(f"{prefix}_RPM", os.getenv("LLM_DEFAULT_RPM", "120")))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv(f"{prefix}_TPM", os.getenv("LLM_DEFAULT_TPM", "0")))
+        burst_seconds = float(os.getenv("LLM_RATE_LIMIT_BURST_SECONDS", "10"))
+        self.default_backoff = float(os.getenv("LLM_RATE_LIMIT_BACKOFF", "5"))
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.lock = threading.Lock()
+        self.paused_until = 0.0
+        self.rate_limited_count = 0
+        self.waits = 0
+        self.total_wait = 0.0
+    
+    def _reserve(self, estimated_tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        with self.lock:
+            wait = max(wait, self.paused_until - time.monotonic())
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+        return wait
+    
+    def paused_for(self) -> float:
+        """Seconds left of the pause after a 429 (0 if the provider is not paused)."""
+        with self.lock:
+            return max(0.0, self.paused_until - time.monotonic())
+    
+    def acquire(self, estimated_tokens: int = 0):
+        """Block (outside any lock) until the provider's budgets allow a request."""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            logger.info(f"⏳ Rate limit: waiting {wait:.2f}s for {self.name}")
+            time.sleep(wait)
+    
+    async def aacquire(self, estimated_tokens: int = 0):
+        """Async variant of ``acquire``."""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            logger.info(f"⏳ Rate limit: waiting {wait:.2f}s for {self.name}")
+            await asyncio.sleep(wait)
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Refund the part of the token reservation the request did not use."""
+        self.tokens.refund(estimated_tokens - actual_tokens)
+    
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]):
+        """Sync the buckets with ``x-ratelimit-remaining-*`` / ``x-ratelimit-reset-*``."""
+        if not headers:
+            return
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                remaining = float(remaining) if remaining is not None else None
+            except ValueError:
+                remaining = None
+            bucket.sync(remaining, parse_duration(headers.get(f"x-ratelimit-reset-{kind}")))
+    
+    def on_rate_limit(self, error: Optional[Exception] = None) -> float:
+        """Pause the provider after a 429, for its Retry-After when given. Returns the pause."""
+        headers = headers_from_error(error) if error is not None else None
+        self.update_from_headers(headers)
+        retry_after = parse_duration(headers.get("retry-after")) if headers else None
+        pause = retry_after if retry_after is not None else self.default_backoff * random.uniform(0.5, 1.0)
+        with self.lock:
+            self.rate_limited_count += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.info(f"Rate limit hit on {self.name}, pausing it for {pause:.1f}s")
+        return pause
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = {
+                "rate_limited_count": self.rate_limited_count,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+                "waits": self.waits,
+                "total_wait": round(self.total_wait, 2),
+            }
+        stats["requests"] = self.requests.get_stats()
+        stats["tokens"] = self.tokens.get_stats()
+        return stats
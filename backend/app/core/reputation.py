@@ -0,0 +1,169 @@
+# File: backend/app/core/reputation.py
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import tldextract
+
+logger = logging.getLogger(__name__)
+
+# Public suffix list lookups, from the snapshot bundled with tldextract (no
+# network). Private suffixes are included so each github.io or blogspot.com
+# site is a domain of its own.
+_extract = tldextract.TLDExtract(suffix_list_urls=(), include_psl_private_domains=True)
+
+# Platforms that host many independent authors under one registrable domain
+# (medium.com/@author, author.substack.com). Their pages have nothing in
+# common but the host, so no verdict is learned for them.
+MULTI_TENANT_DOMAINS = {
+    "medium.com", "substack.com", "wordpress.com", "tumblr.com", "wixsite.com", "weebly.com",
+    "github.com", "gitlab.com", "dev.to", "hashnode.dev", "reddit.com", "quora.com", "linkedin.com",
+    "facebook.com", "x.com", "twitter.com", "youtube.com", "tiktok.com", "scribd.com", "academia.edu",
+}
+
+TRUSTED = True
+BLOCKED = False
+
+
+def registrable_domain(url: str) -> str:
+    """``https://news.bbc.co.uk/a`` -> ``bbc.co.uk``; ``https://alice.github.io`` -> ``alice.github.io``."""
+    try:
+        host = (urlsplit(url.strip()).hostname or "").lower().rstrip(".")
+    except ValueError:
+        return ""
+    if not host:
+        return ""
+    # IP addresses and unknown suffixes have no registrable part; use the host
+    return _extract(host).top_domain_under_public_suffix or host
+
+
+def _parse_domains(value: str) -> set:
+    return {registrable_domain(f"https://{d.strip()}") for d in value.split(",") if d.strip()}
+
+
+class DomainReputation:
+    """
+    Per-domain reliability verdicts that let the pipeline skip LLM review.
+
+    Static ``REPUTATION_ALLOWLIST`` / ``REPUTATION_DENYLIST`` domains always
+    win. Otherwise every LLM review outcome is recorded per registrable domain
+    with exponential decay (``REPUTATION_HALF_LIFE_DAYS``); once a domain has
+    ``REPUTATION_MIN_REVIEWS`` (decayed) reviews that agree at least
+    ``REPUTATION_CONFIDENCE`` of the time, it is trusted or blocked. As the
+    history fades below that count the domain is reviewed again, so learned
+    verdicts are re-checked now and then. Multi-tenant platforms
+    (``MULTI_TENANT_DOMAINS``) are only judged by the static lists. The table
+    lives in memory and in the SQLite file ``REPUTATION_PATH``; an empty path
+    or ``:memory:`` keeps it in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.enabled = os.getenv("REPUTATION_ENABLED", "true").lower() == "true"
+        self.allowlist = _parse_domains(os.getenv("REPUTATION_ALLOWLIST", ""))
+        self.denylist = _parse_domains(os.getenv("REPUTATION_DENYLIST", ""))
+        self.half_life = float(os.getenv("REPUTATION_HALF_LIFE_DAYS", "30")) * 86400
+        self.min_reviews = float(os.getenv("REPUTATION_MIN_REVIEWS", "5"))
+        self.confidence = float(os.getenv("REPUTATION_CONFIDENCE", "0.9"))
+        self.path = path if path is not None else os.getenv("REPUTATION_PATH", ".cache/reputation.db")
+        if self.path == ":memory:":
+            self.path = ""
+        self.lock = threading.Lock()
+        # domain -> [reliable weight, unreliable weight, updated_at]
+        self.table: Dict[str, list] = {}
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lookups = 0
+        if self.path:
+            self._open()
+
+    def _open(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self.conn:
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS reputation ("
+                    "domain TEXT PRIMARY KEY, reliable REAL NOT NULL, unreliable REAL NOT NULL, updated_at REAL NOT NULL)"
+                )
+            for domain, reliable, unreliable, updated_at in self.conn.execute("SELECT * FROM reputation"):
+                self.table[domain] = [reliable, unreliable, updated_at]
+            logger.info(f"Loaded reputation for {len(self.table)} domains from {self.path}")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Domain reputation store unavailable at {self.path}: {e}")
+            self.conn = None
+
+    def _decayed(self, entry: list, now: float) -> Tuple[float, float]:
+        factor = 0.5 ** ((now - entry[2]) / self.half_life) if self.half_life > 0 else 1.0
+        return entry[0] * factor, entry[1] * factor
+
+    def verdict(self, url: str) -> Optional[bool]:
+        """TRUSTED, BLOCKED, or None when the domain still needs an LLM review."""
+        if not self.enabled:
+            return None
+        domain = registrable_domain(url)
+        with self.lock:
+            self.lookups += 1
+            if domain in self.allowlist:
+                result = TRUSTED
+            elif domain in self.denylist:
+                result = BLOCKED
+            elif domain in MULTI_TENANT_DOMAINS:
+                result = None
+            else:
+                entry = self.table.get(domain)
+                result = None
+                if entry is not None:
+                    reliable, unreliable = self._decayed(entry, time.time())
+                    total = reliable + unreliable
+                    if total >= self.min_reviews:
+                        if reliable / total >= self.confidence:
+                            result = TRUSTED
+                        elif unreliable / total >= self.confidence:
+                            result = BLOCKED
+        return result
+
+    def record(self, url: str, is_reliable: bool):
+        """Learn from an LLM review of a source on this domain."""
+        if not self.enabled:
+            return
+        domain = registrable_domain(url)
+        if not domain or domain in MULTI_TENANT_DOMAINS:
+            return
+        now = time.time()
+        with self.lock:
+            entry = self.table.get(domain)
+            reliable, unreliable = self._decayed(entry, now) if entry else (0.0, 0.0)
+            if is_reliable:
+                reliable += 1
+            else:
+                unreliable += 1
+            self.table[domain] = [reliable, unreliable, now]
+            if self.conn is not None:
+                try:
+                    with self.conn:
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO reputation (domain, reliable, unreliable, updated_at) VALUES (?, ?, ?, ?)",
+                            (domain, reliable, unreliable, now),
+                        )
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist reputation of {domain}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "domains": len(self.table),
+                "allowlist": len(self.allowlist),
+                "denylist": len(self.denylist),
+                "lookups": self.lookups,
+                "persistent": self.conn is not None,
+            }
+
+
+# Global instance
+domain_reputation = DomainReputation()
@@ -0,0 +1,139 @@
+# File: backend/app/core/router.py
+import os
+import time
+import threading
+import logging
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Routing strategies understood by ProviderRouter.order()
+STATIC = "static"        # configured order (Groq, OpenAI, Gemini)
+FASTEST = "fastest"      # lowest expected time to an answer, failures included
+RELIABLE = "reliable"    # lowest recent error rate, throughput as tie-breaker
+STRATEGIES = (STATIC, FASTEST, RELIABLE)
+
+
+class ProviderHealth:
+    """Moving statistics for one provider."""
+
+    def __init__(self, name: str, alpha: float, error_half_life: float):
+        self.name = name
+        self.alpha = alpha
+        self.error_half_life = error_half_life
+        self.ewma_latency: Optional[float] = None
+        self.ewma_tokens_per_sec: Optional[float] = None
+        self._error_rate = 0.0
+        self._error_updated = time.time()
+
+    def error_rate(self, now: Optional[float] = None) -> float:
+        """
+        EWMA error rate, decayed towards zero while the provider sees no traffic
+        so that a provider that degraded for a few minutes is tried again.
+        """
+        now = now or time.time()
+        elapsed = max(0.0, now - self._error_updated)
+        return self._error_rate * 0.5 ** (elapsed / self.error_half_life)
+
+    def _update_error(self, failed: bool):
+        now = time.time()
+        current = self.error_rate(now)
+        self._error_rate = self.alpha * (1.0 if failed else 0.0) + (1 - self.alpha) * current
+        self._error_updated = now
+
+    def record_success(self, latency: float, completion_tokens: int):
+        self._update_error(False)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        if latency > 0:
+            tps = completion_tokens / latency
+            if self.ewma_tokens_per_sec is None:
+                self.ewma_tokens_per_sec = tps
+            else:
+                self.ewma_tokens_per_sec = self.alpha * tps + (1 - self.alpha) * self.ewma_tokens_per_sec
+
+    def record_failure(self):
+        self._update_error(True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ewma_latency": self.ewma_latency,
+            "error_rate": round(self.error_rate(), 4),
+            "tokens_per_sec": self.ewma_tokens_per_sec,
+        }
+
+
+class ProviderRouter:
+    """
+    Orders providers for each call from their recent latency, error rate and
+    throughput instead of a fixed preference list.
+    """
+
+    def __init__(self, provider_names: List[str], default_strategy: Optional[str] = None):
+        self.alpha = float(os.getenv("LLM_ROUTING_EWMA_ALPHA", "0.3"))
+        self.error_half_life = float(os.getenv("LLM_ROUTING_ERROR_HALF_LIFE", "120"))
+        # Seconds a failed call costs before the next provider answers (timeouts,
+        # rate-limit back-off); used to turn error rates into expected latency.
+        self.failure_penalty = float(os.getenv("LLM_ROUTING_FAILURE_PENALTY", "5"))
+        self.default_strategy = default_strategy or os.getenv("LLM_ROUTING_STRATEGY", FASTEST)
+        if self.default_strategy not in STRATEGIES:
+            logger.warning(f"Unknown routing strategy '{self.default_strategy}', using '{FASTEST}'")
+            self.default_strategy = FASTEST
+        self.lock = threading.Lock()
+        self.health: Dict[str, ProviderHealth] = {}
+        self.static_order: List[str] = []
+        for name in provider_names:
+            self.add_provider(name)
+
+    def add_provider(self, name: str):
+        with self.lock:
+            if name not in self.health:
+                self.health[name] = ProviderHealth(name, self.alpha, self.error_half_life)
+                self.static_order.append(name)
+
+    def record_success(self, name: str, latency: float, completion_tokens: int = 0):
+        with self.lock:
+            if name in self.health:
+                self.health[name].record_success(latency, completion_tokens)
+
+    def record_failure(self, name: str):
+        with self.lock:
+            if name in self.health:
+                self.health[name].record_failure()
+
+    def _score(self, name: str, strategy: str, now: float):
+        health = self.health[name]
+        # Providers without samples are scored optimistically so each one gets
+        # measured at least once.
+        latency = health.ewma_latency or 0.0
+        tokens_per_sec = health.ewma_tokens_per_sec or float("inf")
+        error_rate = health.error_rate(now)
+        position = self.static_order.index(name)
+        if strategy == RELIABLE:
+            return (round(error_rate, 2), -tokens_per_sec, position)
+        return (latency + error_rate * self.failure_penalty, position)
+
+    def order(self, names: List[str], strategy: Optional[str] = None) -> List[str]:
+        """Return ``names`` sorted best-first for the given strategy."""
+        strategy = strategy or self.default_strategy
+        if strategy == STATIC or strategy not in STRATEGIES:
+            return list(names)
+
+        now = time.time()
+        with self.lock:
+            scored = [n for n in names if n in self.health]
+            ranked = sorted(scored, key=lambda n: self._score(n, strategy, now))
+        return ranked + [n for n in names if n not in self.health]
+
+    def best(self, strategy: str = RELIABLE) -> Optional[str]:
+        ranked = self.order(list(self.health), strategy)
+        return ranked[0] if ranked else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "default_strategy": self.default_strategy,
+                "providers": {name: health.to_dict() for name, health in self.health.items()},
+            }
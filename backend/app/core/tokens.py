@@ -0,0 +1,31 @@
+# File: backend/app/core/tokens.py
+import logging
+
+logger = logging.getLogger(__name__)
+
+# tiktoken is optional: when it is installed token counts are exact for the
+# OpenAI tokenizer (and close enough for Llama/Gemini); otherwise we fall back
+# to the ~4 characters per token estimate used elsewhere in the codebase.
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ImportError, or the encoding could not be loaded offline
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the number of tokens in ``text``."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` down to at most ``max_tokens`` tokens."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * 4]
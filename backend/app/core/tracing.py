@@ -0,0 +1,236 @@
+# File: backend/app/core/tracing.py
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Slack when comparing span boundaries recorded by different threads
+_EPSILON = 0.001
+
+
+class Span:
+    """One timed operation inside a trace: a graph node, an LLM call, a search."""
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": self.end,
+            "duration": round(self.duration, 4),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class _NoopSpan:
+    """Returned outside a trace so instrumented code never needs to check."""
+
+    def set(self, **attributes: Any):
+        pass
+
+
+class Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+        self.root: Optional[Span] = None
+
+    def add(self, span: Span):
+        with self.lock:
+            self.spans.append(span)
+
+    def snapshot(self) -> List[Span]:
+        with self.lock:
+            return list(self.spans)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    In-process tracer. Spans nest through contextvars, which LangGraph and our
+    thread pools copy into worker threads, so node, LLM and search spans of
+    concurrent jobs never mix. Finished traces are kept in memory for the API
+    (``TRACE_HISTORY_LIMIT``) and, when ``TRACE_EXPORT_PATH`` is set, appended
+    to that file as JSON lines, one span per line.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+        self.export_path = os.getenv("TRACE_EXPORT_PATH", "")
+        self.history_limit = int(os.getenv("TRACE_HISTORY_LIMIT", "200"))
+        self.traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.export_lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, trace_id: str, name: str = "job", **attributes: Any) -> Iterator[Any]:
+        """Start a trace whose root span covers the block."""
+        if not self.enabled:
+            yield _NoopSpan()
+            return
+        trace = Trace(trace_id)
+        with self.lock:
+            self.traces[trace_id] = trace
+            while len(self.traces) > self.history_limit:
+                self.traces.popitem(last=False)
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name, kind="job", **attributes) as root:
+                trace.root = root
+                yield root
+        finally:
+            _current_trace.reset(token)
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+        """Record a child span of the current span; a no-op outside a trace."""
+        trace = _current_trace.get()
+        if trace is None:
+            yield _NoopSpan()
+            return
+        parent = _current_span.get()
+        span = Span(name, kind, trace.trace_id, parent.span_id if parent else None, attributes)
+        trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.time()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # A generator closed from another context (e.g. by the GC)
+                pass
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self.lock:
+            return self.traces.get(trace_id)
+
+    def _export(self, trace: Trace):
+        if not self.export_path:
+            return
+        try:
+            directory = os.path.dirname(self.export_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            lines = [json.dumps(span.to_dict(), default=str) for span in trace.snapshot()]
+            with self.export_lock, open(self.export_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except Exception as e:
+            logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+def critical_path(spans: List[Span]) -> List[Span]:
+    """
+    The chain of spans that determined the trace's end-to-end duration.
+
+    Starting from the root, repeatedly follow the child that finished last
+    before the current point in time, then step back to its start and look
+    for the sibling that finished before that; each chosen child is expanded
+    the same way. Parallel branches that finished early are left out.
+    """
+    children: Dict[Optional[str], List[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id, []).append(span)
+    roots = children.get(None, [])
+    if not roots:
+        return []
+
+    def walk(span: Span) -> List[Span]:
+        path: List[List[Span]] = []
+        cursor = span.end if span.end is not None else time.time()
+        candidates = [c for c in children.get(span.span_id, []) if c.end is not None]
+        while True:
+            finished = [c for c in candidates if c.end <= cursor + _EPSILON]
+            if not finished:
+                break
+            last = max(finished, key=lambda c: c.end)
+            path.append(walk(last))
+            cursor = last.start
+            candidates = [c for c in finished if c is not last and c.end <= cursor + _EPSILON]
+        return [span] + [s for segment in reversed(path) for s in segment]
+
+    return walk(min(roots, key=lambda s: s.start))
+
+
+def summarize_trace(trace: Trace, include_spans: bool = False) -> Dict[str, Any]:
+    """Critical path plus per-kind time totals, for the trace API."""
+    spans = trace.snapshot()
+    root = trace.root
+    origin = root.start if root else min((s.start for s in spans), default=time.time())
+    path = critical_path(spans)
+    totals: Dict[str, Dict[str, float]] = {}
+    for span in spans:
+        if span.kind == "job":
+            continue
+        entry = totals.setdefault(span.kind, {"count": 0, "total_seconds": 0.0})
+        entry["count"] += 1
+        entry["total_seconds"] = round(entry["total_seconds"] + span.duration, 4)
+    summary = {
+        "trace_id": trace.trace_id,
+        "duration": round(root.duration, 4) if root else None,
+        "finished": bool(root and root.end is not None),
+        "span_count": len(spans),
+        "critical_path": [
+            {
+                "name": span.name,
+                "kind": span.kind,
+                "offset": round(span.start - origin, 4),
+                "duration": round(span.duration, 4),
+                "status": span.status,
+                "attributes": span.attributes,
+            }
+            for span in path
+        ],
+        "totals_by_kind": totals,
+    }
+    if include_spans:
+        summary["spans"] = [span.to_dict() for span in spans]
+    return summary
+
+
+# Global instance
+tracer = Tracer()
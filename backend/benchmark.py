@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the research pipeline.
+
+Runs N research jobs through ``research_graph`` against simulated LLM
+providers and a simulated Exa backend, so it needs no API keys or network
+and its numbers are comparable between runs. Latency distributions, error
+and 429 injection and content sizes are configurable; every random draw is
+seeded from ``--seed`` and the request it belongs to, so results do not
+depend on thread scheduling.
+
+Examples:
+    python benchmark.py --jobs 20 --concurrency 5
+    python benchmark.py --llm-latency lognormal:0.4:0.6 --rate-limit-rate 0.05
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json --tolerance 0.15
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional
+
+WORDS = (
+    "energy solar battery grid storage market policy research cost efficiency "
+    "growth data model network capacity demand supply price investment report "
+    "analysis trend region industry technology adoption emissions carbon panel "
+    "module inverter wind hydro nuclear transition forecast survey study result"
+).split()
+
+
+class LatencyDistribution:
+    """
+    Parsed from ``kind:params``:
+        fixed:SECONDS
+        uniform:LOW:HIGH
+        lognormal:MEDIAN:SIGMA
+        exponential:MEAN
+    """
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+        if kind not in expected or len(self.params) != expected[kind]:
+            raise ValueError(f"Invalid latency distribution '{spec}' (see --help)")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * rng.lognormvariate(0.0, sigma)
+        return rng.expovariate(1.0 / self.params[0])
+
+
+def make_text(rng: random.Random, chars: int) -> str:
+    words: List[str] = []
+    size = 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+class CallLedger:
+    """Outbound calls per job, attributed through the governor's job context."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_job: Dict[Optional[str], Counter] = {}
+        self.by_provider: Dict[str, Counter] = {}
+        self.attempts: Counter = Counter()
+
+    def record(self, job_id: Optional[str], provider: str, event: str, amount: int = 1):
+        with self.lock:
+            self.by_job.setdefault(job_id, Counter())[event] += amount
+            self.by_provider.setdefault(provider, Counter())[event] += amount
+
+    def attempt(self, key: str) -> int:
+        """How many times this exact request was made before, so retries draw new outcomes."""
+        with self.lock:
+            self.attempts[key] += 1
+            return self.attempts[key]
+
+
+class SimulatedProviderError(Exception):
+    def __init__(self, message: str, status_code: int = 500, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Same shape as the OpenAI / Groq SDK errors the rate limiter reads
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def build_llm_provider_class():
+    # LLMProvider is imported after the environment is prepared (see main)
+    from app.core.multi_llm import LLMProvider
+    from app.core.governor import current_job_id
+
+    class SimulatedLLMProvider(LLMProvider):
+        """An LLM provider that answers in the formats the agents parse, after a simulated delay."""
+
+        def __init__(self, name: str, args: argparse.Namespace, ledger: CallLedger):
+            self.name = name
+            self.model = f"simulated-{name.lower()}"
+            self.context_window = args.context_window
+            self.latency = LatencyDistribution(args.llm_latency)
+            self.error_rate = args.error_rate
+            self.rate_limit_rate = args.rate_limit_rate
+            self.retry_after = args.retry_after
+            self.completion_chars = args.completion_chars
+            self.tasks_per_plan = args.tasks
+            self.reliable_rate = args.reliable_rate
+            self.seed = args.seed
+            self.ledger = ledger
+
+        def _rng(self, prompt: str, max_tokens: int) -> random.Random:
+            key = f"{self.name}:{max_tokens}:{prompt}"
+            return random.Random(f"{self.seed}:{key}:{self.ledger.attempt(key)}")
+
+        def _respond(self, prompt: str, max_tokens: int, rng: random.Random) -> str:
+            if "[TASKS]" in prompt:
+                tasks = "\n".join(
+                    f"{i}. Investigate {' '.join(rng.sample(WORDS, 4))}" for i in range(1, self.tasks_per_plan + 1)
+                )
+                return f"[SUMMARY]\n{make_text(rng, 200)}\n[/SUMMARY]\n[TASKS]\n{tasks}\n[/TASKS]"
+            if "[/SUMMARY]" in prompt and "RELIABLE:" in prompt:
+                # Fused summarize + review
+                summary = make_text(rng, min(self.completion_chars, max_tokens * 3))
+                return f"[SUMMARY]\n{summary}\n[/SUMMARY]\n{self._review(rng, prompt)}"
+            sources = re.findall(r"^\[SOURCE (\d+)\]\nSource URL: (\S+)$", prompt, re.MULTILINE)
+            if sources:
+                # Batch review: one block per numbered summary
+                return "\n".join(
+                    f"[SOURCE {n}]\n{self._review(rng, url)}\n[/SOURCE {n}]" for n, url in sources
+                )
+            if "RELIABLE:" in prompt:
+                return self._review(rng, prompt)
+            return make_text(rng, min(self.completion_chars, max_tokens * 4))
+
+        def _review(self, rng: random.Random, text: str) -> str:
+            # Sources on good domains are almost always reliable, on bad ones rarely
+            url = re.search(r"https://(\S+?)/", text)
+            domain = url.group(1) if url else ""
+            good = random.Random(f"{self.seed}:{domain}").random() < self.reliable_rate
+            verdict = "YES" if rng.random() < (0.95 if good else 0.1) else "NO"
+            claims = ", ".join(make_text(rng, 40) for _ in range(3))
+            return f"RELIABLE: {verdict}\nCRITIQUE: {make_text(rng, 300)}\nCLAIMS: {claims}"
+
+        def _begin(self, prompt: str, max_tokens: int):
+            """Draw this call's latency, outcome and answer."""
+            rng = self._rng(prompt, max_tokens)
+            job_id = current_job_id.get()
+            self.ledger.record(job_id, self.name, "llm_calls")
+            self.ledger.record(job_id, self.name, "prompt_chars", len(prompt))
+            delay = self.latency.sample(rng)
+            roll = rng.random()
+            if roll < self.rate_limit_rate:
+                self.ledger.record(job_id, self.name, "rate_limited")
+                error = SimulatedProviderError(
+                    "429 simulated rate limit", 429, {"retry-after": str(self.retry_after)})
+                # Rejections come back quickly
+                return delay * 0.1, error, ""
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.ledger.record(job_id, self.name, "errors")
+                return delay, SimulatedProviderError("simulated provider error"), ""
+            return delay, None, self._respond(prompt, max_tokens, rng)
+
+        def generate(self, prompt: str, max_tokens: int = 300) -> str:
+            delay, error, text = self._begin(prompt, max_tokens)
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            return text
+
+        async def agenerate(self, prompt: str, max_tokens: int = 300) -> str:
+            delay, error, text = self._begin(prompt, max_tokens)
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return text
+
+        def stream(self, prompt: str, max_tokens: int = 300) -> Iterator[str]:
+            delay, error, text = self._begin(prompt, max_tokens)
+            time.sleep(delay)
+            if error is not None:
+                raise error
+            for i in range(0, len(text), 64):
+                yield text[i:i + 64]
+
+        async def astream(self, prompt: str, max_tokens: int = 300) -> AsyncIterator[str]:
+            delay, error, text = self._begin(prompt, max_tokens)
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            for i in range(0, len(text), 64):
+                yield text[i:i + 64]
+
+        def is_available(self) -> bool:
+            return True
+
+        def get_name(self) -> str:
+            return self.name
+
+    return SimulatedLLMProvider
+
+
+class SimulatedExa:
+    """
+    Stands in for ``exa_py.Exa`` / ``AsyncExa``: ``search``, ``get_contents``
+    and ``search_and_contents`` with simulated latency. Contents options are
+    honoured like the real API: ``text={"max_characters": n}`` caps the text,
+    ``highlights`` returns query-relevant snippets, and with no options the
+    text is capped at 10,000 characters.
+    """
+
+    DEFAULT_MAX_CHARACTERS = 10000
+
+    def __init__(self, args: argparse.Namespace, ledger: CallLedger):
+        self.latency = LatencyDistribution(args.search_latency)
+        self.error_rate = args.search_error_rate
+        self.page_chars = args.page_chars
+        self.domains = args.domains
+        self.seed = args.seed
+        self.ledger = ledger
+        # url -> (title, full page text), so contents fetched later match the search
+        self.pages: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def _begin(self, key: str, event: str):
+        from app.core.governor import current_job_id
+
+        rng = random.Random(f"{self.seed}:{key}:{self.ledger.attempt(key)}")
+        job_id = current_job_id.get()
+        self.ledger.record(job_id, "exa", event)
+        delay = self.latency.sample(rng)
+        if rng.random() < self.error_rate:
+            self.ledger.record(job_id, "exa", "errors")
+            return rng, delay, SimulatedProviderError(f"simulated {event} error")
+        return rng, delay, None
+
+    def _pages(self, rng: random.Random, query: str, num_results: int) -> List[SimpleNamespace]:
+        pages = []
+        for i in range(num_results):
+            # Page sizes vary around the configured mean, like real articles
+            chars = max(200, int(rng.gauss(self.page_chars, self.page_chars * 0.4)))
+            page_id = uuid.UUID(int=rng.getrandbits(128)).hex[:12]
+            page = SimpleNamespace(
+                url=f"https://www.source{rng.randrange(self.domains)}.com/{page_id}",
+                title=f"Result {i + 1} for {query}",
+                text=make_text(rng, chars),
+            )
+            with self.lock:
+                self.pages[page.url] = page
+            pages.append(page)
+        return pages
+
+    def _contents(self, rng: random.Random, page: SimpleNamespace, options: Dict[str, Any]) -> SimpleNamespace:
+        text_option = options.get("text")
+        highlights_option = options.get("highlights")
+        if text_option is None and highlights_option is None:
+            text_option = {"max_characters": self.DEFAULT_MAX_CHARACTERS}
+        text = None
+        if text_option:
+            limit = text_option.get("max_characters") if isinstance(text_option, dict) else None
+            text = page.text[:limit] if limit else page.text
+        highlights = None
+        if highlights_option:
+            settings = highlights_option if isinstance(highlights_option, dict) else {}
+            size = 120 * settings.get("num_sentences", 3)
+            starts = sorted(rng.sample(range(max(1, len(page.text) - size)),
+                                       min(settings.get("highlights_per_url", 3), max(1, len(page.text) - size))))
+            highlights = [page.text[start:start + size] for start in starts]
+            if settings.get("max_characters"):
+                budget, kept = settings["max_characters"], []
+                for highlight in highlights:
+                    if budget <= 0:
+                        break
+                    kept.append(highlight[:budget])
+                    budget -= len(kept[-1])
+                highlights = kept
+        return SimpleNamespace(url=page.url, title=page.title, text=text, highlights=highlights)
+
+    def _record_content(self, results: List[SimpleNamespace]):
+        from app.core.governor import current_job_id
+
+        chars = sum(len(r.text or "") + sum(len(h) for h in (r.highlights or [])) for r in results)
+        self.ledger.record(current_job_id.get(), "exa", "content_chars", chars)
+
+    def _search(self, query: str, num_results: int, contents: Any):
+        rng, delay, error = self._begin(f"exa:{num_results}:{query}", "searches")
+        if error is not None:
+            return delay, error, None
+        pages = self._pages(rng, query, num_results)
+        if contents is False:
+            results = [SimpleNamespace(url=p.url, title=p.title, text=None, highlights=None) for p in pages]
+        else:
+            results = [self._contents(rng, page, contents or {}) for page in pages]
+            self._record_content(results)
+        return delay, None, SimpleNamespace(results=results)
+
+    def _get_contents(self, urls: Any, options: Dict[str, Any]):
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        rng, delay, error = self._begin(f"exa:contents:{','.join(urls)}", "fetches")
+        if error is not None:
+            return delay, error, None
+        with self.lock:
+            pages = [self.pages[url] for url in urls if url in self.pages]
+        results = [self._contents(rng, page, options) for page in pages]
+        self._record_content(results)
+        return delay, None, SimpleNamespace(results=results)
+
+    @staticmethod
+    def _finish(delay: float, error: Optional[Exception], response: Any):
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    def search(self, query: str, num_results: int = 10, contents: Any = None, **kwargs):
+        return self._finish(*self._search(query, num_results, contents))
+
+    def search_and_contents(self, query: str, num_results: int = 10, **kwargs):
+        return self._finish(*self._search(query, num_results, kwargs))
+
+    def get_contents(self, urls: Any, **kwargs):
+        return self._finish(*self._get_contents(urls, kwargs))
+
+
+class AsyncSimulatedExa(SimulatedExa):
+    @staticmethod
+    async def _afinish(delay: float, error: Optional[Exception], response: Any):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    async def search(self, query: str, num_results: int = 10, contents: Any = None, **kwargs):
+        return await self._afinish(*self._search(query, num_results, contents))
+
+    async def search_and_contents(self, query: str, num_results: int = 10, **kwargs):
+        return await self._afinish(*self._search(query, num_results, kwargs))
+
+    async def get_contents(self, urls: Any, **kwargs):
+        return await self._afinish(*self._get_contents(urls, kwargs))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear interpolation between closest ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.core.graph import research_graph, searcher_agent, run_config, discard_checkpoints
+    from app.core.multi_llm import multi_llm_client
+    from app.core.governor import job_context
+    from app.core.tracing import tracer
+
+    ledger = CallLedger()
+    provider_class = build_llm_provider_class()
+    names = [f"Sim{chr(ord('A') + i)}" for i in range(args.providers)]
+    multi_llm_client.set_providers([provider_class(name, args, ledger) for name in names])
+    searcher_agent.client = SimulatedExa(args, ledger)
+    searcher_agent.async_client = AsyncSimulatedExa(args, ledger)
+
+    def run_job(index: int) -> Dict[str, Any]:
+        job_id = f"bench-{index}"
+        query = f"Benchmark query {index}: {' '.join(random.Random(f'{args.seed}:{index}').sample(WORDS, 5))}?"
+        start = time.perf_counter()
+        try:
+            with job_context(job_id), tracer.trace(job_id, query=query):
+                result = research_graph.invoke({"query": query}, run_config(job_id))
+            error = result.get("error")
+        except Exception as e:
+            error = str(e)
+        discard_checkpoints(job_id)
+        return {"job_id": job_id, "latency": time.perf_counter() - start, "error": error}
+
+    print(f"🚀 Running {args.jobs} jobs, {args.concurrency} at a time, against {len(names)} simulated providers...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="benchmark-job") as pool:
+        jobs = list(pool.map(run_job, range(args.jobs)))
+    wall_time = time.perf_counter() - started
+
+    completed = [j for j in jobs if not j["error"]]
+    latencies = [j["latency"] for j in completed]
+    per_job = [ledger.by_job.get(j["job_id"], Counter()) for j in jobs]
+
+    def mean_of(event: str) -> float:
+        return round(statistics.mean(c[event] for c in per_job), 2) if per_job else 0.0
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "log_level")},
+        "jobs": len(jobs),
+        "completed": len(completed),
+        "failed": len(jobs) - len(completed),
+        "errors": sorted({j["error"] for j in jobs if j["error"]})[:5],
+        "wall_time": round(wall_time, 3),
+        "throughput_jobs_per_min": round(len(completed) / wall_time * 60, 2) if wall_time else 0.0,
+        "latency": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(statistics.mean(latencies), 3) if latencies else 0.0,
+            "max": round(max(latencies), 3) if latencies else 0.0,
+        },
+        "per_job": {
+            "llm_calls": mean_of("llm_calls"),
+            "searches": mean_of("searches"),
+            "fetches": mean_of("fetches"),
+            "rate_limited": mean_of("rate_limited"),
+            "errors": mean_of("errors"),
+            "prompt_chars": mean_of("prompt_chars"),
+            "content_chars": mean_of("content_chars"),
+        },
+        "providers": {name: dict(counts) for name, counts in sorted(ledger.by_provider.items())},
+    }
+
+
+# Metrics where a higher value is a regression, as (section, key)
+REGRESSION_KEYS = [
+    ("latency", "p50"), ("latency", "p95"), ("latency", "p99"),
+    ("per_job", "llm_calls"), ("per_job", "searches"), ("per_job", "prompt_chars"),
+    ("per_job", "content_chars"),
+]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond ``tolerance`` (a fraction) relative to ``baseline``."""
+    regressions = []
+    for section, key in REGRESSION_KEYS:
+        old = baseline.get(section, {}).get(key)
+        new = results[section][key]
+        if old and new > old * (1 + tolerance):
+            regressions.append(f"{section}.{key}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    old_throughput = baseline.get("throughput_jobs_per_min")
+    if old_throughput and results["throughput_jobs_per_min"] < old_throughput * (1 - tolerance):
+        regressions.append(f"throughput_jobs_per_min: {old_throughput} -> {results['throughput_jobs_per_min']}")
+    if results["failed"] > baseline.get("failed", 0):
+        regressions.append(f"failed: {baseline.get('failed', 0)} -> {results['failed']}")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]):
+    latency = results["latency"]
+    per_job = results["per_job"]
+    print("-" * 50)
+    print("📊 BENCHMARK RESULTS:")
+    print(f"Jobs: {results['completed']}/{results['jobs']} completed, {results['failed']} failed")
+    for error in results["errors"]:
+        print(f"  ❌ {error}")
+    print(f"Wall time: {results['wall_time']:.2f}s, throughput: {results['throughput_jobs_per_min']:.1f} jobs/min")
+    print(f"Job latency: p50={latency['p50']:.2f}s p95={latency['p95']:.2f}s p99={latency['p99']:.2f}s "
+          f"mean={latency['mean']:.2f}s max={latency['max']:.2f}s")
+    print(f"Per job: {per_job['llm_calls']} LLM calls, {per_job['searches']} searches, "
+          f"{per_job['fetches']} content fetches, "
+          f"{per_job['rate_limited']} 429s, {per_job['errors']} errors, "
+          f"{per_job['prompt_chars'] / 1000:.1f}k prompt chars, {per_job['content_chars'] / 1000:.1f}k page chars")
+    for name, counts in results["providers"].items():
+        print(f"  {name}: {counts}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0].strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=LatencyDistribution.__doc__,
+    )
+    parser.add_argument("--jobs", type=int, default=20, help="research jobs to run")
+    parser.add_argument("--concurrency", type=int, default=5, help="jobs in flight at once")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--providers", type=int, default=2, help="simulated LLM providers")
+    parser.add_argument("--llm-latency", default="lognormal:0.3:0.5", help="latency of one LLM call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of LLM calls that fail")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of LLM calls rejected with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--completion-chars", type=int, default=1200, help="size of summaries and reports")
+    parser.add_argument("--context-window", type=int, default=8192, help="simulated providers' context window")
+    parser.add_argument("--tasks", type=int, default=3, help="tasks per research plan")
+    parser.add_argument("--reliable-rate", type=float, default=0.8, help="fraction of source domains that are reliable")
+    parser.add_argument("--search-latency", default="lognormal:0.6:0.4", help="latency of one Exa search")
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--domains", type=int, default=40, help="distinct source domains")
+    parser.add_argument("--page-chars", type=int, default=8000, help="mean text size of a search result")
+    parser.add_argument("--rpm", type=int, default=0, help="LLM_DEFAULT_RPM for the simulated providers (0 = unlimited)")
+    parser.add_argument("--cache", action="store_true", help="keep the LLM and search caches enabled")
+    parser.add_argument("--log-level", default="ERROR", help="log level of the app's loggers")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression vs. the baseline")
+    return parser.parse_args(argv)
+
+
+def prepare_environment(args: argparse.Namespace):
+    """Settings read when the app modules are imported, so this runs first."""
+    # The real clients are created at import time and need some key; the
+    # simulated backends replace them before any call is made.
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("EXA_API_KEY", "benchmark")
+    os.environ["LLM_DEFAULT_RPM"] = str(args.rpm)
+    os.environ["LLM_DEFAULT_TPM"] = "0"
+    # Simulated domains must not leak into a real reputation table
+    os.environ["REPUTATION_PATH"] = ""
+    os.environ["CHECKPOINT_PATH"] = ":memory:"
+    if not args.cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["SEARCH_CACHE_ENABLED"] = "false"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    prepare_environment(args)
+    import logging
+    logging.basicConfig(level=args.log_level.upper())
+
+    results = run_benchmark(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ Regressions vs. {args.compare} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"✅ No regressions vs. {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
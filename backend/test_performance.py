@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 """
-Performance test script for OrchestrateAI with adaptive rate limiting.
+Performance test script for OrchestrateAI with per-provider rate limiting.
 """
 
 import time
 import logging
 from app.core.graph import execute_research
-from app.core.rate_limiter import rate_limiter
+from app.core.multi_llm import multi_llm_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +23,7 @@ def test_performance():
     print("-" * 50)
     
     # Get initial rate limiter stats
-    initial_stats = rate_limiter.get_stats()
+    initial_stats = multi_llm_client.get_stats()["rate_limits"]
     print(f"Initial rate limiter stats: {initial_stats}")
     
     # Start timing
@@ -38,7 +38,7 @@ def test_performance():
         execution_time = end_time - start_time
         
         # Get final stats
-        final_stats = rate_limiter.get_stats()
+        final_stats = multi_llm_client.get_stats()["rate_limits"]
         
         print("-" * 50)
         print("📊 PERFORMANCE RESULTS:")
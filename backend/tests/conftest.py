@@ -0,0 +1,8 @@
+import os
+
+# The global LLM client and search agent are created at import time and need
+# at least one configured provider; tests never call them over the network.
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("EXA_API_KEY", "test")
+# Keep learned domain reputation out of the working tree
+os.environ.setdefault("REPUTATION_PATH", "")
@@ -0,0 +1,51 @@
+from app.core.chunking import chunk_text, group_by_tokens
+from app.core.tokens import count_tokens
+
+
+def _paragraphs(count: int, sentences: int = 6) -> str:
+    return "\n\n".join(
+        " ".join(f"Paragraph {p} sentence {s} talks about tidal power output." for s in range(sentences))
+        for p in range(count)
+    )
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("  Just one sentence.  ", 100) == ["Just one sentence."]
+    assert chunk_text("   ", 100) == []
+
+
+def test_chunks_fit_and_keep_sentences_whole():
+    text = _paragraphs(12)
+    chunks = chunk_text(text, 80)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 80 for chunk in chunks)
+    for chunk in chunks:
+        assert chunk.endswith(".")
+        assert chunk.startswith("Paragraph")
+    # Without overlap nothing is lost or repeated
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_overlap_repeats_trailing_sentences():
+    chunks = chunk_text(_paragraphs(12), 80, overlap_tokens=20)
+    last_sentence = chunks[0].split(". ")[-1].split("\n\n")[-1]
+    assert chunks[1].startswith(last_sentence.rstrip("."))
+
+
+def test_oversized_sentence_is_split_on_words():
+    sentence = " ".join(f"word{i}" for i in range(2000)) + "."
+    chunks = chunk_text(sentence, 100)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == sentence.split()
+
+
+def test_group_by_tokens_packs_in_order():
+    texts = ["alpha " * 30, "beta " * 30, "gamma " * 30, "delta " * 90]
+    limit = count_tokens(texts[0]) + count_tokens(texts[1])
+    groups = group_by_tokens(texts, limit)
+    assert [text for group in groups for text in group] == texts
+    assert groups[0] == texts[:2]
+    # A text larger than the limit still gets a group of its own
+    assert groups[-1] == [texts[-1]]
+    assert group_by_tokens([], limit) == []
@@ -0,0 +1,53 @@
+from app.core.dedup import MinHasher, SourceDeduplicator, canonicalize_url, deduplicate_results
+
+ARTICLE = (
+    "Tidal stream generators convert the kinetic energy of moving water into electricity. "
+    "Unlike wind, tides are predictable years in advance, which makes the output easy to "
+    "schedule. The largest installations today sit in narrow channels where the current is "
+    "strongest, and operators report capacity factors well above those of offshore wind."
+)
+
+
+def test_canonicalize_url_drops_cosmetic_differences():
+    assert canonicalize_url("http://www.Example.com:443/a/b/?utm_source=x&id=2#top") == "https://example.com/a/b?id=2"
+    assert canonicalize_url("https://m.example.com/a/b/amp") == "https://example.com/a/b"
+    assert canonicalize_url("https://example.com/a/b.amp.html") == "https://example.com/a/b.html"
+    assert canonicalize_url("https://www-example-com.cdn.ampproject.org/c/s/www.example.com/a/b") == "https://example.com/a/b"
+
+
+def test_canonicalize_url_keeps_distinct_pages():
+    assert canonicalize_url("https://example.com/docs/amp/guide") != canonicalize_url("https://example.com/docs/guide")
+    assert canonicalize_url("https://example.com:8080/a") == "https://example.com:8080/a"
+    assert canonicalize_url("https://example.com/a?b=2&a=1") == "https://example.com/a?a=1&b=2"
+    assert canonicalize_url("") == ""
+
+
+def test_minhash_similarity():
+    hasher = MinHasher()
+    original = hasher.signature(ARTICLE)
+    assert MinHasher.similarity(original, hasher.signature(ARTICLE + " Updated 2024.")) >= 0.8
+    assert MinHasher.similarity(original, hasher.signature("A completely different page about bread baking and sourdough starters.")) < 0.2
+    assert hasher.signature("") is None
+
+
+def test_deduplicator_matches_urls_and_content():
+    deduplicator = SourceDeduplicator()
+    assert deduplicator.duplicate_of({"url": "https://example.com/tides", "content": ARTICLE}) is None
+    assert deduplicator.duplicate_of({"url": "https://www.example.com/tides/", "content": ""}) == "https://example.com/tides"
+    assert deduplicator.duplicate_of({"url": "https://mirror.net/copy", "content": ARTICLE}) == "https://example.com/tides"
+    assert deduplicator.duplicate_of({"url": "https://example.com/bread", "content": "Sourdough needs a starter."}) is None
+
+
+def test_deduplicate_results_keeps_references_to_duplicates():
+    task_results = [
+        {"task": "B", "task_index": 1, "results": [
+            {"url": "https://mirror.net/copy", "content": ARTICLE},
+            {"url": "https://example.com/other", "content": "Something else entirely about grid storage."},
+        ]},
+        {"task": "A", "task_index": 0, "results": [{"url": "https://example.com/tides", "content": ARTICLE}]},
+    ]
+    unique, stats = deduplicate_results(task_results)
+    assert [entry["task"] for entry in unique] == ["A", "B"]
+    assert [result["url"] for result in unique[1]["results"]] == ["https://example.com/other"]
+    assert unique[1]["duplicates"] == [{"url": "https://mirror.net/copy", "original": "https://example.com/tides"}]
+    assert stats == {"total": 3, "kept": 2, "url_duplicates": 0, "content_duplicates": 1}
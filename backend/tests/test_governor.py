@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.governor import AdmissionTimeoutError, Governor, QueueFullError, job_context
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    governor = Governor(default_limit=1, wait_timeout=5)
+    holder = governor.acquire("llm")
+    order = []
+
+    def call(n):
+        with governor.slot("llm"):
+            order.append(n)
+
+    threads = []
+    for n in range(4):
+        thread = threading.Thread(target=call, args=(n,))
+        thread.start()
+        threads.append(thread)
+        # Enqueue one at a time so the arrival order is known
+        _wait_for(lambda: len(governor.waiters["llm"]) == n + 1)
+    governor.release("llm", holder)
+    for thread in threads:
+        thread.join()
+    assert order == [0, 1, 2, 3]
+    assert governor.get_stats()["resources"]["llm"]["admitted"] == 5
+
+
+def test_job_cap_does_not_block_other_jobs():
+    governor = Governor(default_limit=4, job_limit=1, wait_timeout=5)
+    with job_context("a"):
+        first = governor.acquire("llm")
+    admitted = []
+
+    def call(job_id):
+        with job_context(job_id), governor.slot("llm"):
+            admitted.append(job_id)
+
+    blocked = threading.Thread(target=call, args=("a",))
+    blocked.start()
+    _wait_for(lambda: len(governor.waiters["llm"]) == 1)
+    # Job "b" passes job "a"'s waiter, which is only held back by its own cap
+    call("b")
+    assert admitted == ["b"]
+    governor.release("llm", first)
+    blocked.join()
+    assert admitted == ["b", "a"]
+
+
+def test_full_queue_rejects():
+    governor = Governor(default_limit=1, max_waiters=1, wait_timeout=5)
+    holder = governor.acquire("llm")
+    waiter = threading.Thread(target=lambda: governor.release("llm", governor.acquire("llm")))
+    waiter.start()
+    _wait_for(lambda: len(governor.waiters["llm"]) == 1)
+    with pytest.raises(QueueFullError):
+        governor.acquire("llm")
+    assert governor.get_stats()["resources"]["llm"]["rejected"] == 1
+    governor.release("llm", holder)
+    waiter.join()
+
+
+def test_wait_times_out():
+    governor = Governor(default_limit=1)
+    governor.acquire("llm")
+    with pytest.raises(AdmissionTimeoutError):
+        governor.acquire("llm", timeout=0.05)
+    stats = governor.get_stats()["resources"]["llm"]
+    assert stats["timed_out"] == 1 and stats["waiting"] == 0
+
+
+def test_async_waiters_share_the_queue_with_threads():
+    governor = Governor(default_limit=1, wait_timeout=5)
+    holder = governor.acquire("llm")
+    order = []
+
+    def thread_call():
+        with governor.slot("llm"):
+            order.append("thread")
+
+    async def main():
+        async def call():
+            async with governor.aslot("llm"):
+                order.append("async")
+
+        first = asyncio.create_task(call())
+        while not governor.waiters.get("llm"):
+            await asyncio.sleep(0.005)
+        thread = threading.Thread(target=thread_call)
+        thread.start()
+        while len(governor.waiters["llm"]) < 2:
+            await asyncio.sleep(0.005)
+        governor.release("llm", holder)
+        await first
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert order == ["async", "thread"]
+
+
+def test_async_wait_times_out_and_cancels():
+    governor = Governor(default_limit=1)
+    governor.acquire("llm")
+
+    async def main():
+        with pytest.raises(AdmissionTimeoutError):
+            await governor.aacquire("llm", timeout=0.05)
+        task = asyncio.create_task(governor.aacquire("llm", timeout=5))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    stats = governor.get_stats()["resources"]["llm"]
+    assert (stats["timed_out"], stats["cancelled"], stats["waiting"]) == (1, 1, 0)
@@ -0,0 +1,69 @@
+import pytest
+
+from app.agents.reviewer import ReviewerAgent
+
+
+class _Window:
+    """Stands in for the LLM client where only the context window matters."""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+
+    def context_window(self) -> int:
+        return self.tokens
+
+
+@pytest.fixture
+def reviewer():
+    agent = ReviewerAgent()
+    agent.batch_size = 3
+    agent.batch_max_output_tokens = 2000
+    agent.multi_llm = _Window(32000)
+    return agent
+
+
+def _items(count: int, words: int = 20):
+    return [(" ".join(["finding"] * words), f"https://example.com/{n}") for n in range(count)]
+
+
+def test_plan_batches_respects_batch_size(reviewer):
+    items = _items(7)
+    batches = reviewer._plan_batches(items)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [item for batch in batches for item in batch] == items
+
+
+def test_plan_batches_respects_output_and_context_limits(reviewer):
+    reviewer.batch_max_output_tokens = reviewer._batch_max_tokens(2)
+    assert [len(batch) for batch in reviewer._plan_batches(_items(5))] == [2, 2, 1]
+
+    reviewer.batch_max_output_tokens = 2000
+    reviewer.multi_llm = _Window(3000)
+    batches = reviewer._plan_batches(_items(4, words=800))
+    # Summaries too large to share a prompt are reviewed one by one
+    assert [len(batch) for batch in batches] == [1, 1, 1, 1]
+
+
+def test_parse_batch_response(reviewer):
+    response = (
+        "[SOURCE 1]\nRELIABLE: YES\nCRITIQUE: Well sourced.\nCLAIMS: tides are predictable, output is steady\n[/SOURCE 1]\n"
+        "**SOURCE 2:**\nRELIABLE: no\nCRITIQUE: Marketing copy.\nCLAIMS: best turbine ever\n"
+        "[SOURCE 3]\nNo verdict here.\n"
+        "[SOURCE 9]\nRELIABLE: YES\nCRITIQUE: Out of range.\nCLAIMS: x\n"
+    )
+    reviews = reviewer._parse_batch_response(response, 3)
+    assert sorted(reviews) == [1, 2]
+    assert reviews[1].is_reliable and reviews[1].has_verdict
+    assert reviews[1].critique == "Well sourced."
+    assert reviews[1].verified_claims == ["tides are predictable", "output is steady"]
+    assert not reviews[2].is_reliable and reviews[2].critique == "Marketing copy."
+
+
+def test_parse_batch_response_keeps_first_block_per_source(reviewer):
+    response = (
+        "[SOURCE 1]\nRELIABLE: YES\nCRITIQUE: First.\nCLAIMS: a\n"
+        "[SOURCE 1]\nRELIABLE: NO\nCRITIQUE: Second.\nCLAIMS: b\n"
+    )
+    reviews = reviewer._parse_batch_response(response, 1)
+    assert reviews[1].critique == "First." and reviews[1].is_reliable
+    assert reviewer._parse_batch_response("no blocks at all", 2) == {}
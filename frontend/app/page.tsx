@@ -26,7 +26,7 @@ type ApiResponse = {
 export default function Home() {
   const [query, setQuery] = useState<string | null>(null);
   const [hasSearched, setHasSearched] = useState(false);
-  const { progress, status, error, finalReport } = useJobWebSocket(query);
+  const { progress, status, error, finalReport, streamingReport } = useJobWebSocket(query);
   const loading = status === "running";
 
   const handleQuery = (q: string) => {
@@ -63,8 +63,15 @@ export default function Home() {
           </div>
           {/* Right: Report Artifact or Skeleton */}
           <div className="flex-1 min-w-[350px] max-w-[600px]">
-            {loading ? (
+            {loading && !streamingReport ? (
               <ReportSkeleton />
+            ) : loading ? (
+              <ReportArtifact
+                loading={loading}
+                result={{ final_report: streamingReport }}
+                error={error}
+                expandAll={true}
+              />
             ) : (
               <ReportArtifact
                 loading={loading}
@@ -7,6 +7,7 @@ export function useJobWebSocket(query: string | null) {
   const [status, setStatus] = useState<"idle" | "running" | "complete" | "error">("idle");
   const [error, setError] = useState<string | null>(null);
   const [finalReport, setFinalReport] = useState<string | null>(null);
+  const [streamingReport, setStreamingReport] = useState<string>("");
   const wsRef = useRef<WebSocket | null>(null);
 
   useEffect(() => {
@@ -15,6 +16,7 @@ export function useJobWebSocket(query: string | null) {
     setStatus("running");
     setError(null);
     setFinalReport(null);
+    setStreamingReport("");
 
     const ws = new WebSocket("ws://localhost:8000/api/v1/ws/jobs");
     wsRef.current = ws;
@@ -27,6 +29,12 @@ export function useJobWebSocket(query: string | null) {
       const data = JSON.parse(event.data);
       console.log("[WebSocket] Received:", data);
       
+      // Handle incremental report text streamed by the writer
+      if (data.status === "streaming" && data.token) {
+        setStreamingReport((prev) => prev + data.token);
+        return;
+      }
+      
       // Handle final completion message (when the job is fully done)
       if (data.status === "complete" && data.final_report) {
         setStatus("complete");
@@ -94,5 +102,5 @@ export function useJobWebSocket(query: string | null) {
     // eslint-disable-next-line
   }, [query]);
 
-  return { progress, status, error, finalReport };
+  return { progress, status, error, finalReport, streamingReport };
 }
\ No newline at end of file